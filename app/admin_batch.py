@@ -0,0 +1,213 @@
+"""Batched admin operations for /api/admin/batch.
+
+Operations are validated up front against users, badges and badge awards fetched in bulk,
+then applied in chunks: each chunk is one transaction made of bulk UPDATE/DELETE statements,
+one multi-row INSERT ... ON CONFLICT DO NOTHING for the badge awards and a single multi-row
+AuditLog insert. Every operation gets its own result entry, so one bad item doesn't sink the
+rest of the batch. Password resets are hashed inline, so ADMIN_BATCH_MAX_RESETS caps them.
+
+Supported operations (each takes `user_id`, or `user_ids` to expand to one item per user):
+
+    {"op": "award_badge", "user_id": 1, "badge_key": "streak_7"}
+    {"op": "revoke_badge", "user_id": 1, "badge_key": "streak_7"}
+    {"op": "promote", "user_id": 1, "make_admin": true}
+    {"op": "regenerate_share", "user_ids": [1, 2, 3]}
+    {"op": "reset_password", "user_id": 1}
+"""
+import secrets
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import delete, insert, select, tuple_, update
+from werkzeug.security import generate_password_hash
+
+from app.models import db, AuditLog, Badge, SyncTombstone, User, UserBadge
+from app.sync import next_versions
+from app.upsert import insert_ignore_many
+
+OPERATIONS = ('award_badge', 'revoke_badge', 'promote', 'regenerate_share', 'reset_password')
+PREFETCH_CHUNK = 500  # ids per IN (...) when prefetching
+
+
+def _as_bool(value):
+    # Accept 'true'/'false' strings like the single-user endpoints do for form posts
+    if isinstance(value, str):
+        return value.lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
+
+
+def expand(operations):
+    """Flatten `user_ids` lists into one item per user; returns (items, results with errors filled in)."""
+    items, results = [], []
+    for op in operations:
+        if not isinstance(op, dict):
+            results.append({'op': None, 'status': 'error', 'error': 'operation must be an object'})
+            items.append(None)
+            continue
+        user_ids = op.get('user_ids') if 'user_ids' in op else [op.get('user_id')]
+        if not isinstance(user_ids, list):
+            user_ids = [user_ids]
+        for raw in user_ids:
+            result = {'op': op.get('op'), 'user_id': raw, 'status': 'pending'}
+            try:
+                result['user_id'] = int(raw)
+            except (TypeError, ValueError):
+                result.update(status='error', error='invalid user_id')
+            results.append(result)
+            items.append(op)
+    return items, results
+
+
+def _prefetch(user_ids, badge_keys):
+    users = {}
+    ids = sorted(user_ids)
+    for i in range(0, len(ids), PREFETCH_CHUNK):
+        rows = db.session.execute(
+            select(User.id, User.is_admin).where(User.id.in_(ids[i:i + PREFETCH_CHUNK]))
+        )
+        users.update({uid: bool(is_admin) for uid, is_admin in rows})
+    badges = dict(db.session.execute(select(Badge.key, Badge.id).where(Badge.key.in_(badge_keys))).all()) if badge_keys else {}
+    owned = set()
+    if badges:
+        for i in range(0, len(ids), PREFETCH_CHUNK):
+            owned.update(db.session.execute(
+                select(UserBadge.user_id, UserBadge.badge_id)
+                .where(UserBadge.user_id.in_(ids[i:i + PREFETCH_CHUNK]), UserBadge.badge_id.in_(badges.values()))
+            ).all())
+    admins = set(db.session.execute(select(User.id).where(User.is_admin == True)).scalars())  # noqa: E712
+    return users, badges, owned, admins
+
+
+def validate(items, results):
+    """Check every pending item against prefetched state, in order; returns the planned changes.
+
+    Later items see the effect of earlier ones (e.g. awarding the same badge twice fails
+    the second time).
+    """
+    user_ids = {r['user_id'] for r in results if r['status'] == 'pending'}
+    badge_keys = {op.get('badge_key') for op in items if op and isinstance(op.get('badge_key'), str)}
+    users, badges, owned, admins = _prefetch(user_ids, badge_keys)
+
+    planned = []
+    for index, (op, result) in enumerate(zip(items, results)):
+        if result['status'] != 'pending':
+            continue
+        kind, user_id = op.get('op'), result['user_id']
+        error = None
+        if kind not in OPERATIONS:
+            error = 'invalid op'
+        elif user_id not in users:
+            error = 'user not found'
+        elif kind in ('award_badge', 'revoke_badge'):
+            result['badge_key'] = op.get('badge_key')
+            badge_id = badges.get(result['badge_key']) if isinstance(result['badge_key'], str) else None
+            if not isinstance(result['badge_key'], str):
+                error = 'invalid badge_key'
+            elif badge_id is None:
+                error = 'badge not found'
+            elif kind == 'award_badge' and (user_id, badge_id) in owned:
+                error = 'already awarded'
+            elif kind == 'revoke_badge' and (user_id, badge_id) not in owned:
+                error = 'badge not awarded'
+            else:
+                (owned.add if kind == 'award_badge' else owned.discard)((user_id, badge_id))
+        elif kind == 'promote':
+            make_admin = _as_bool(op.get('make_admin', True))
+            result['is_admin'] = make_admin
+            if not make_admin and admins == {user_id}:
+                error = 'cannot remove admin role from last admin'
+            else:
+                (admins.add if make_admin else admins.discard)(user_id)
+        if error:
+            result.update(status='error', error=error)
+        else:
+            planned.append(index)
+    return planned, badges
+
+
+def _apply_chunk(actor_id, chunk, items, results, badges):
+    """Apply one chunk of validated items in the current transaction (caller commits)."""
+    now = datetime.utcnow()
+    audit = {}
+    badge_ops, admin_flags, tokens, passwords = {}, [], [], []
+    for index in chunk:
+        op, result = items[index], results[index]
+        kind, user_id = op['op'], result['user_id']
+        if kind in ('award_badge', 'revoke_badge'):
+            badge_ops.setdefault((user_id, badges[result['badge_key']], result['badge_key']), []).append((kind, index))
+            audit[index] = (kind, f"user_id={user_id} badge={result['badge_key']}")
+        elif kind == 'promote':
+            admin_flags.append({'id': user_id, 'is_admin': result['is_admin']})
+            audit[index] = ('promote' if result['is_admin'] else 'demote', f'user_id={user_id}')
+        elif kind == 'regenerate_share':
+            result['share_token'] = secrets.token_urlsafe(12)
+            tokens.append({'id': user_id, 'share_token': result['share_token']})
+            audit[index] = ('regenerate_share', f'user_id={user_id}')
+        elif kind == 'reset_password':
+            result['temp_password'] = secrets.token_urlsafe(8)
+            passwords.append((user_id, result['temp_password']))
+            audit[index] = ('reset_password', f'user_id={user_id}')
+
+    # Validation makes awards and revokes of the same badge alternate, so an even number of
+    # them for one (user, badge) cancels out and an odd number has the effect of the first
+    awards = {change: ops for change, ops in badge_ops.items() if len(ops) % 2 and ops[0][0] == 'award_badge'}
+    revokes = [change for change, ops in badge_ops.items() if len(ops) % 2 and ops[0][0] == 'revoke_badge']
+
+    # Hash inline, before the first write so the slow part doesn't hold the transaction open;
+    # a process pool per request is too fragile on serverless hosts
+    hashed = [{'id': user_id, 'password_hash': generate_password_hash(pw)} for user_id, pw in passwords]
+
+    # Bulk UPDATE by primary key: one executemany per column set
+    for rows in (admin_flags, tokens, hashed):
+        if rows:
+            db.session.execute(update(User), rows)
+    if awards or revokes:
+        # Badge changes are Core writes, so stamp the sync versions here
+        versions = next_versions(db.session.connection(), {uid for uid, _, _ in list(awards) + revokes})
+        inserted = set(insert_ignore_many(
+            UserBadge,
+            [{'user_id': uid, 'badge_id': bid, 'awarded_at': now, 'version': versions[uid]} for uid, bid, _ in awards],
+            ('user_id', 'badge_id'),
+            (UserBadge.user_id, UserBadge.badge_id),
+        ))
+        for (uid, bid, _), ops in awards.items():
+            if (uid, bid) not in inserted:
+                # Awarded by someone else (e.g. a check-in) since validation
+                for _, index in ops:
+                    results[index].update(status='error', error='already awarded')
+                    del audit[index]
+        if revokes:
+            db.session.execute(delete(UserBadge).where(
+                tuple_(UserBadge.user_id, UserBadge.badge_id).in_([(uid, bid) for uid, bid, _ in revokes])
+            ))
+            db.session.execute(insert(SyncTombstone), [
+                {'user_id': uid, 'kind': 'badge', 'key': key, 'version': versions[uid]} for uid, _, key in revokes
+            ])
+    if audit:
+        db.session.execute(insert(AuditLog), [
+            {'actor_id': actor_id, 'action': action, 'details': details, 'created_at': now}
+            for action, details in audit.values()
+        ])
+
+
+def run_batch(actor_id, operations, chunk_size=500):
+    """Validate and apply `operations`; returns one result dict per (expanded) operation."""
+    items, results = expand(operations)
+    planned, badges = validate(items, results)
+    for i in range(0, len(planned), chunk_size):
+        chunk = planned[i:i + chunk_size]
+        try:
+            _apply_chunk(actor_id, chunk, items, results, badges)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.exception('Admin batch chunk failed')
+            for index in chunk:
+                results[index].pop('share_token', None)
+                results[index].pop('temp_password', None)
+                results[index].update(status='error', error=f'chunk failed: {type(e).__name__}')
+            continue
+        for index in chunk:
+            if results[index]['status'] == 'pending':
+                results[index]['status'] = 'ok'
+    return results
@@ -0,0 +1,240 @@
+"""Admin analytics computed with NumPy over the whole workout table.
+
+All `Workout (user_id, date)` pairs are streamed once into columnar arrays; daily/weekly
+active users, signup-week retention cohorts and streak-length histograms are then
+computed with vectorized operations. Results are cached for ANALYTICS_CACHE_SECONDS.
+"""
+import threading
+import time
+from operator import itemgetter
+from datetime import date, datetime
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import select
+
+from app.models import db, User, Workout
+
+STREAK_BUCKETS = [1, 2, 3, 7, 14, 30, 100]  # histogram lower bounds
+# (user_id, day) pairs are packed into one int64 as user_id << DAY_BITS | day + DAY_OFFSET;
+# the offset keeps days before 1970 (negative day numbers) inside the low bits
+DAY_BITS = 24
+DAY_OFFSET = 1 << (DAY_BITS - 1)
+
+_cache = {'at': 0.0, 'data': None}
+_cache_lock = threading.Lock()
+
+
+def _day_numbers(date_strings):
+    """'YYYY-MM-DD' strings -> days since 1970-01-01."""
+    joined = ''.join(date_strings).encode('ascii')
+    if len(joined) != 10 * len(date_strings):
+        return np.array(date_strings, dtype='datetime64[D]').astype(np.int64)
+    # Parse the digits in bulk, then convert with the days-from-civil algorithm
+    digits = np.frombuffer(joined, dtype=np.uint8).reshape(-1, 10).astype(np.int64) - 48
+    y = digits[:, 0] * 1000 + digits[:, 1] * 100 + digits[:, 2] * 10 + digits[:, 3]
+    m = digits[:, 5] * 10 + digits[:, 6]
+    d = digits[:, 8] * 10 + digits[:, 9]
+    y = y - (m <= 2)
+    era = y // 400
+    yoe = y - era * 400
+    doy = (153 * (m + np.where(m > 2, -3, 9)) + 2) // 5 + d - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+def _run_starts(*columns):
+    """Boolean mask of the positions where any of `columns` differs from the previous one."""
+    mask = np.zeros(len(columns[0]), dtype=bool)
+    mask[:1] = True
+    for column in columns:
+        mask[1:] |= column[1:] != column[:-1]
+    return mask
+
+
+def _unique_pairs(user_ids, days):
+    """Distinct (user_id, day) pairs sorted by user then day."""
+    if not len(days):
+        return user_ids, days
+    packed_days = days + DAY_OFFSET
+    if packed_days.min() < 0 or packed_days.max() >= 1 << DAY_BITS:
+        raise ValueError('workout dates out of range for analytics')
+    if user_ids.min() < 0 or user_ids.max() >= 1 << (63 - DAY_BITS):
+        raise ValueError('user ids out of range for analytics')
+    keys = np.sort((user_ids << DAY_BITS) | packed_days)
+    keys = keys[_run_starts(keys)]
+    return keys >> DAY_BITS, (keys & ((1 << DAY_BITS) - 1)) - DAY_OFFSET
+
+
+def _group_starts(sorted_values):
+    return np.flatnonzero(_run_starts(sorted_values))
+
+
+def _unique_user_weeks(uids, weeks):
+    """Distinct (user, week) pairs from pairs already sorted by user then day."""
+    keep = _run_starts(uids, weeks)
+    return uids[keep], weeks[keep]
+
+
+def _week_numbers(days):
+    # 1970-01-01 was a Thursday; shifting by 3 makes weeks start on Monday
+    return (days + 3) // 7
+
+
+def load_workout_columns(batch_size=100000):
+    """Stream every (user_id, date) once; returns (user_ids, day_numbers) arrays.
+
+    Rows come straight from a DBAPI cursor on the session's connection (so replica routing
+    still applies): building ORM or Core rows for millions of pairs costs more than the
+    analytics themselves. Columns are split with itemgetter, which is much faster than
+    zip(*rows) on large batches.
+    """
+    conn = db.session.connection()
+    cursor = conn.connection.cursor()
+    user_chunks, day_chunks = [], []
+    try:
+        cursor.execute(str(select(Workout.user_id, Workout.date).compile(conn)))
+        while True:
+            part = cursor.fetchmany(batch_size)
+            if not part:
+                break
+            user_chunks.append(np.fromiter(map(itemgetter(0), part), dtype=np.int64, count=len(part)))
+            day_chunks.append(_day_numbers(list(map(itemgetter(1), part))))
+    finally:
+        cursor.close()
+    if not user_chunks:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(user_chunks), np.concatenate(day_chunks)
+
+
+def load_signup_days():
+    """(user_ids, signup day numbers or -1 when unknown)."""
+    rows = db.session.execute(select(User.id, User.created_at)).all()
+    uids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+    days = np.fromiter(
+        ((r[1].date() - date(1970, 1, 1)).days if r[1] else -1 for r in rows), dtype=np.int64, count=len(rows)
+    )
+    return uids, days
+
+
+def active_users(uids, days, today, n_days, n_weeks):
+    """DAU for the last `n_days` and WAU for the last `n_weeks` (oldest first).
+
+    `uids`/`days` are distinct (user, day) pairs sorted by user then day.
+    """
+    start = today - n_days + 1
+    mask = (days >= start) & (days <= today)
+    dau = np.bincount(days[mask] - start, minlength=n_days)
+
+    first_week = _week_numbers(np.int64(today)) - n_weeks + 1
+    week_uids, weeks = _unique_user_weeks(uids, _week_numbers(days))
+    mask = (weeks >= first_week) & (weeks < first_week + n_weeks)
+    wau = np.bincount(weeks[mask] - first_week, minlength=n_weeks)
+    return dau, wau
+
+
+def retention_cohorts(uids, days, signup_uids, signup_days, today, n_cohorts):
+    """Share of each signup-week cohort active N weeks after signing up."""
+    size = int(max(uids.max(initial=0), signup_uids.max(initial=0))) + 1
+    # Users without a recorded signup fall back to their first workout day
+    first_day = np.full(size, np.iinfo(np.int64).max)
+    starts = _group_starts(uids)
+    first_day[uids[starts]] = days[starts]
+    signup = np.full(size, -1, dtype=np.int64)
+    signup[signup_uids] = signup_days
+    unknown = signup < 0
+    signup[unknown] = first_day[unknown]
+    known = signup < np.iinfo(np.int64).max
+    cohort_week = np.where(known, _week_numbers(np.where(known, signup, 0)), -1)
+
+    this_week = _week_numbers(np.int64(today))
+    first_cohort = this_week - n_cohorts + 1
+    user_cohort = cohort_week - first_cohort  # index into the cohort table, <0 = too old
+
+    week_uids, weeks = _unique_user_weeks(uids, _week_numbers(days))
+    cohort = user_cohort[week_uids]
+    offset = weeks - cohort_week[week_uids]
+    valid = (cohort >= 0) & (offset >= 0) & (offset < n_cohorts)
+    active = np.bincount(cohort[valid] * n_cohorts + offset[valid], minlength=n_cohorts * n_cohorts)
+    active = active.reshape(n_cohorts, n_cohorts)
+
+    in_window = (user_cohort >= 0) & (user_cohort < n_cohorts)
+    sizes = np.bincount(user_cohort[in_window], minlength=n_cohorts)[:n_cohorts]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rates = np.where(sizes[:, None] > 0, active / sizes[:, None], 0.0)
+    return [
+        {
+            'week_start': str(np.datetime64(int(first_cohort + i) * 7 - 3, 'D')),
+            'users': int(sizes[i]),
+            # Only weeks that have already happened for this cohort
+            'retention': [round(float(r), 3) for r in rates[i, :n_cohorts - i]],
+        }
+        for i in range(n_cohorts)
+    ]
+
+
+def streak_runs(uids, ds):
+    """All runs of consecutive workout days: (user_id per run, last day per run, length per run)."""
+    if not len(uids):
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty
+    breaks = np.ones(len(uids), dtype=bool)
+    breaks[1:] = (uids[1:] != uids[:-1]) | (ds[1:] - ds[:-1] != 1)
+    starts = np.flatnonzero(breaks)
+    ends = np.append(starts[1:], len(uids)) - 1
+    return uids[starts], ds[ends], ends - starts + 1
+
+
+def histogram(values):
+    counts = np.bincount(np.searchsorted(STREAK_BUCKETS, values, side='right') - 1, minlength=len(STREAK_BUCKETS))
+    labels = [
+        f'{lo}' if hi == lo + 1 else f'{lo}-{hi - 1}'
+        for lo, hi in zip(STREAK_BUCKETS, STREAK_BUCKETS[1:])
+    ] + [f'{STREAK_BUCKETS[-1]}+']
+    return [{'bucket': label, 'users': int(c)} for label, c in zip(labels, counts)]
+
+
+def streak_distributions(uids, days, today):
+    run_users, run_last_day, run_len = streak_runs(uids, days)
+    if not len(run_users):
+        return {'best': histogram(np.empty(0, dtype=np.int64)), 'current': histogram(np.empty(0, dtype=np.int64))}
+    # Best streak per user: runs are grouped by user, so take the max over each group
+    best = np.maximum.reduceat(run_len, _group_starts(run_users))
+    # Current streak: runs still alive today (or ending yesterday, like display_streak)
+    current = run_len[run_last_day >= today - 1]
+    return {'best': histogram(best), 'current': histogram(current)}
+
+
+def compute(n_days=30, n_weeks=12, n_cohorts=12):
+    today = (datetime.now().date() - date(1970, 1, 1)).days
+    user_ids, days = load_workout_columns()
+    signup_uids, signup_days = load_signup_days()
+    total = len(days)
+    # Every metric works on distinct (user, day) pairs sorted by user then day
+    user_ids, days = _unique_pairs(user_ids, days)
+    dau, wau = active_users(user_ids, days, today, n_days, n_weeks)
+    return {
+        'generated_at': datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'),
+        'workouts': int(total),
+        'users': int(len(signup_uids)),
+        'dau': [
+            {'date': str(np.datetime64(int(today - n_days + 1 + i), 'D')), 'users': int(v)}
+            for i, v in enumerate(dau)
+        ],
+        'wau': [
+            {'week_start': str(np.datetime64(int(_week_numbers(np.int64(today)) - n_weeks + 1 + i) * 7 - 3, 'D')), 'users': int(v)}
+            for i, v in enumerate(wau)
+        ],
+        'cohorts': retention_cohorts(user_ids, days, signup_uids, signup_days, today, n_cohorts),
+        'streaks': streak_distributions(user_ids, days, today),
+    }
+
+
+def get_analytics(refresh=False):
+    """Cached analytics payload (recomputed after ANALYTICS_CACHE_SECONDS)."""
+    ttl = current_app.config.get('ANALYTICS_CACHE_SECONDS', 300)
+    with _cache_lock:
+        if refresh or _cache['data'] is None or time.time() - _cache['at'] > ttl:
+            _cache['data'] = compute()
+            _cache['at'] = time.time()
+        return _cache['data']
@@ -0,0 +1,230 @@
+"""Optional ASGI entry point.
+
+The read-heavy API endpoints (/api/stats, /api/calendar and /api/workouts) are served by
+async handlers on an async SQLAlchemy engine, so slow DB round-trips don't hold a worker
+thread each. Every other request (and any read request whose login has to be restored
+from the remember-me cookie) is passed through to the regular Flask app, so models,
+sessions and auth are shared. That includes the public /share/<token> page, which needs
+the app's rate limiting and profiling.
+
+The async handlers follow the Flask app's replica routing and compression: when
+DATABASE_READ_URL is set, endpoints whose Flask view is `@read_replica` read from a second
+async engine on the replica, except within REPLICA_STICKY_SECONDS of the user's last write,
+and JSON bodies are compressed under the same COMPRESS_* settings as the after_request hook.
+
+Run with any ASGI server, e.g.:
+
+    pip install uvicorn aiosqlite   # asyncpg instead of aiosqlite for Postgres
+    uvicorn app.asgi:application
+
+The async driver is derived from the configured database (sqlite -> aiosqlite,
+postgresql -> asyncpg) unless ASYNC_DATABASE_URL is set.
+"""
+import json
+import os
+import time
+from urllib.parse import parse_qs
+
+from asgiref.wsgi import WsgiToAsgi
+from flask import request
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.app import app as flask_app
+from app import bitmaps
+from app.compression import choose_encoding, compress
+from app.models import db, User, Workout, WorkoutBitmap
+from app.replica import REPLICA_BIND
+
+wsgi_app = WsgiToAsgi(flask_app)
+
+
+def _async_engine_config(url, engine_options):
+    """Translate a Flask-SQLAlchemy engine URL + options into an async driver URL + options."""
+    options = {}
+    if url.get_backend_name() == 'sqlite':
+        url = url.set(drivername='sqlite+aiosqlite')
+    elif url.get_backend_name() == 'postgresql':
+        url = url.set(drivername='postgresql+asyncpg')
+        connect_args = (engine_options or {}).get('connect_args') or {}
+        if connect_args.get('ssl_context'):
+            # asyncpg takes the SSLContext as `ssl` rather than pg8000's `ssl_context`
+            options['connect_args'] = {'ssl': connect_args['ssl_context'], 'timeout': connect_args.get('timeout', 5)}
+    return url, options
+
+
+def _async_engine(url, engine_options):
+    url, options = _async_engine_config(url, engine_options)
+    return create_async_engine(url, **options)
+
+
+def _create_async_engines():
+    """(primary, replica or None) async engines mirroring the Flask app's binds."""
+    override = os.environ.get('ASYNC_DATABASE_URL')
+    replica_options = (flask_app.config.get('SQLALCHEMY_BINDS') or {}).get(REPLICA_BIND)
+    with flask_app.app_context():
+        url = make_url(override) if override else db.engine.url
+        replica_url = db.engines[REPLICA_BIND].url if replica_options else None
+    primary = _async_engine(url, flask_app.config.get('SQLALCHEMY_ENGINE_OPTIONS'))
+    replica = _async_engine(replica_url, replica_options) if replica_url is not None else None
+    return primary, replica
+
+
+async_engine, async_replica_engine = _create_async_engines()
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+AsyncReplicaSessionLocal = async_sessionmaker(async_replica_engine, expire_on_commit=False) if async_replica_engine else None
+
+
+def _request_context(scope):
+    headers = [(k.decode('latin-1'), v.decode('latin-1')) for k, v in scope.get('headers', [])]
+    return flask_app.test_request_context(
+        scope.get('path', '/'),
+        query_string=scope.get('query_string', b''),
+        headers=headers,
+        base_url=f"{scope.get('scheme', 'http')}://{dict(headers).get('host', 'localhost')}",
+    )
+
+
+def _read_session(ctx, use_replica):
+    """(user_id, whether to read from the replica) from the Flask session cookie."""
+    from flask import session as flask_session
+    with ctx:
+        user_id = flask_session.get('_user_id')
+        last_write = flask_session.get('_last_write_at')
+    # Same read-your-writes rule as app.replica: stay on the primary right after a write
+    sticky = last_write and time.time() - last_write < flask_app.config['REPLICA_STICKY_SECONDS']
+    return user_id, bool(use_replica and AsyncReplicaSessionLocal is not None and not sticky)
+
+
+async def _load_viewer(session, user_id):
+    """Return the logged-in (active) User for the session's user id, or None."""
+    if not user_id:
+        return None
+    row = (await session.execute(
+        select(User.id, User.username, User.is_admin, User.is_active).where(User.id == int(user_id))
+    )).first()
+    if not row or row.is_active is False:
+        return None
+    # Detached User instance: enough for templates and never touches the sync session
+    return User(id=row.id, username=row.username, is_admin=row.is_admin, is_active=True)
+
+
+async def _user_bitmaps(session, user_id):
+    """{year: bitmap} for a user; built from the rows (without saving) if none exist yet."""
+    rows = (await session.execute(
+        select(WorkoutBitmap.year, WorkoutBitmap.bits).where(WorkoutBitmap.user_id == user_id)
+    )).all()
+    if rows:
+        return {year: bitmaps.from_bytes(bits) for year, bits in rows}
+    dates = await session.execute(select(Workout.date).where(Workout.user_id == user_id))
+    return bitmaps.bitmaps_from_dates(dates.scalars().all())
+
+
+def _encode(ctx, body, mimetype):
+    """Compress `body` the way app.compression's after_request hook would: (body, headers)."""
+    cfg = flask_app.config
+    if not cfg['COMPRESS_ENABLED'] or mimetype not in cfg['COMPRESS_MIMETYPES']:
+        return body, []
+    with ctx:
+        encoding = choose_encoding(request.accept_encodings, cfg['COMPRESS_BROTLI'])
+    if encoding is None or len(body) < cfg['COMPRESS_MIN_SIZE']:
+        return body, [(b'vary', b'Accept-Encoding')]
+    return compress(body, encoding, cfg['COMPRESS_LEVEL']), [
+        (b'content-encoding', encoding.encode('latin-1')),
+        (b'vary', b'Accept-Encoding'),
+    ]
+
+
+async def _send(send, ctx, status, body, content_type):
+    body, headers = _encode(ctx, body, content_type)
+    await send({'type': 'http.response.start', 'status': status, 'headers': [
+        (b'content-type', content_type.encode('latin-1')),
+        (b'content-length', str(len(body)).encode('latin-1')),
+        *headers,
+    ]})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def _send_json(send, ctx, payload, status=200):
+    await _send(send, ctx, status, json.dumps(payload).encode('utf-8'), 'application/json')
+
+
+async def stats_view(session, viewer, query):
+    return bitmaps.build_stats(await _user_bitmaps(session, viewer.id))
+
+
+async def workouts_view(session, viewer, query):
+    rows = await session.execute(
+        select(Workout.date, Workout.notes).where(Workout.user_id == viewer.id).order_by(Workout.date)
+    )
+    return [{'date': date, 'notes': notes} for date, notes in rows]
+
+
+async def calendar_view(session, viewer, query):
+    from datetime import datetime
+    month = query.get('month', [None])[0]
+    year = query.get('year', [None])[0]
+    if not month or not year:
+        now = datetime.now()
+        month, year = now.month, now.year
+    else:
+        month, year = int(month), int(year)
+    return {
+        'workout_dates': bitmaps.month_days(await _user_bitmaps(session, viewer.id), year, month),
+        'month': month,
+        'year': year
+    }
+
+
+API_VIEWS = {
+    '/api/stats': stats_view,
+    '/api/workouts': workouts_view,
+    '/api/calendar': calendar_view,
+}
+
+
+def _replica_paths():
+    """The API_VIEWS paths whose Flask view is marked @read_replica."""
+    adapter = flask_app.url_map.bind('localhost')
+    return {
+        path for path in API_VIEWS
+        if getattr(flask_app.view_functions[adapter.match(path, 'GET')[0]], 'use_replica', False)
+    }
+
+
+REPLICA_PATHS = _replica_paths()
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await async_engine.dispose()
+            if async_replica_engine is not None:
+                await async_replica_engine.dispose()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await _lifespan(receive, send)
+
+    path = scope.get('path', '')
+    is_read = scope['type'] == 'http' and scope.get('method') == 'GET'
+    api_view = API_VIEWS.get(path) if is_read else None
+
+    if api_view:
+        ctx = _request_context(scope)
+        user_id, use_replica = _read_session(ctx, path in REPLICA_PATHS)
+        async with (AsyncReplicaSessionLocal if use_replica else AsyncSessionLocal)() as session:
+            viewer = await _load_viewer(session, user_id)
+            if viewer is not None:
+                payload = await api_view(session, viewer, parse_qs(scope.get('query_string', b'').decode('latin-1')))
+                return await _send_json(send, ctx, payload)
+        # Not logged in via the session cookie: let Flask-Login handle remember-me / redirects
+
+    await wsgi_app(scope, receive, send)
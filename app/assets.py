@@ -0,0 +1,131 @@
+"""Fingerprinted, precompressed static assets.
+
+`build_assets()` minifies the app's JS/CSS, writes content-hashed copies (plus `.gz` and,
+when `brotli` is installed, `.br` siblings) to static/dist/ and records the mapping in
+static/dist/manifest.json. It needs no network access or external tools, so it can run
+offline as part of a deploy:
+
+    python -m app.assets        # or: flask build-assets
+
+Templates link assets with `asset_url('js/main.js')`, which resolves through the
+manifest and falls back to the unhashed file when no build exists. Hashed files are
+served with `Cache-Control: immutable` and the precompressed variant the client accepts.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+
+from flask import abort, current_app, request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+ASSETS = ['js/main.js', 'js/routines.js', 'js/confetti.js', 'css/style.css']
+DIST_DIR = 'dist'
+MANIFEST = 'manifest.json'
+
+
+def minify_css(text):
+    text = re.sub(r'/\*.*?\*/', '', text, flags=re.S)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+    return text.replace(';}', '}').strip()
+
+
+def minify_js(text):
+    """Conservative line-based JS minifier: drops indentation, blank lines and `//` comment
+    lines, but leaves the contents of multi-line template literals untouched."""
+    out = []
+    in_template = False
+    for line in text.splitlines():
+        if in_template:
+            out.append(line)
+        else:
+            stripped = line.strip()
+            if stripped and not stripped.startswith('//'):
+                out.append(stripped)
+        if len(re.findall(r'(?<!\\)`', line)) % 2:
+            in_template = not in_template
+    return '\n'.join(out) + '\n'
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def build_assets(static_folder):
+    """Build static/dist/ and return the manifest {logical name: hashed path}."""
+    dist = os.path.join(static_folder, DIST_DIR)
+    shutil.rmtree(dist, ignore_errors=True)
+    manifest = {}
+    for name in ASSETS:
+        with open(os.path.join(static_folder, name), encoding='utf-8') as f:
+            source = f.read()
+        minified = (minify_css(source) if name.endswith('.css') else minify_js(source)).encode('utf-8')
+        digest = hashlib.sha256(minified).hexdigest()[:12]
+        stem, ext = os.path.splitext(name)
+        hashed = f'{DIST_DIR}/{stem}.{digest}{ext}'
+        target = os.path.join(static_folder, hashed)
+        _write(target, minified)
+        _write(target + '.gz', gzip.compress(minified, compresslevel=9, mtime=0))
+        if brotli is not None:
+            _write(target + '.br', brotli.compress(minified, quality=11))
+        manifest[name] = hashed
+    with open(os.path.join(dist, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(static_folder):
+    try:
+        with open(os.path.join(static_folder, DIST_DIR, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def asset_url(filename, **kwargs):
+    """url_for('static', ...) replacement that prefers the fingerprinted build."""
+    app = current_app._get_current_object()
+    manifest = app.extensions.get('asset_manifest')
+    if manifest is None or app.debug:
+        manifest = app.extensions['asset_manifest'] = load_manifest(app.static_folder)
+    return url_for('static', filename=manifest.get(filename, filename), **kwargs)
+
+
+def init_assets(app):
+    app.add_template_global(asset_url)
+
+    @app.route(f'{app.static_url_path}/{DIST_DIR}/<path:filename>')
+    def hashed_static(filename):
+        from app.compression import choose_encoding
+        if filename == MANIFEST:
+            abort(404)
+        dist = os.path.join(app.static_folder, DIST_DIR)
+        encoding = choose_encoding(request.accept_encodings)
+        suffix = {'br': '.br', 'gzip': '.gz'}.get(encoding)
+        if suffix and not os.path.isfile(os.path.join(dist, filename + suffix)):
+            suffix = None
+        mimetype = 'text/css' if filename.endswith('.css') else 'application/javascript'
+        response = send_from_directory(dist, filename + (suffix or ''), mimetype=mimetype, max_age=31536000)
+        if suffix:
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+    return app
+
+
+if __name__ == '__main__':
+    static = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+    for logical, hashed in build_assets(static).items():
+        print(f'{logical} -> {hashed}')
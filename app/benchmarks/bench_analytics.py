@@ -0,0 +1,88 @@
+"""Time the admin analytics (app/analytics.py) over a large workout table.
+
+Seeds a throwaway database (a local SQLite file by default; point DATABASE_URL at a
+local Postgres to use that instead) with --users users of --workouts workouts each, then
+reports the median time of loading the (user_id, date) columns, both through the ORM
+session with yield_per (how analytics read them before) and the way
+load_workout_columns() does now, and of a full compute().
+
+    python -m app.benchmarks.bench_analytics --users 2000 --workouts 500
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+os.environ.setdefault('INSTANCE_PATH', tempfile.mkdtemp(prefix='gym_bench_'))
+
+import numpy as np  # noqa: E402
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from app import analytics  # noqa: E402
+from app.app import app  # noqa: E402
+from app.models import db, User, Workout  # noqa: E402
+
+
+def seed(users, workouts):
+    """Create `users` users named statbench0.. with `workouts` workouts each (every other day)."""
+    with app.app_context():
+        if db.session.execute(select(User.id).where(User.username.like('statbench%')).limit(1)).first():
+            return
+        db.session.execute(insert(User), [
+            {'username': f'statbench{i}', 'email': f'statbench{i}@example.com', 'password_hash': 'x'}
+            for i in range(users)
+        ])
+        ids = db.session.execute(select(User.id).where(User.username.like('statbench%'))).scalars().all()
+        first = date.today() - timedelta(days=2 * workouts)
+        for n, uid in enumerate(ids):
+            # Offset each user so the streaks and cohorts aren't all identical
+            days = [(first + timedelta(days=2 * d + n % 2)).strftime('%Y-%m-%d') for d in range(workouts)]
+            db.session.execute(insert(Workout), [{'user_id': uid, 'date': d, 'notes': ''} for d in days])
+        db.session.commit()
+
+
+def orm_load():
+    # load_workout_columns() before it read from a raw cursor
+    result = db.session.execute(select(Workout.user_id, Workout.date).execution_options(yield_per=100000))
+    user_chunks, day_chunks = [], []
+    for part in result.partitions():
+        uids, dates = zip(*part)
+        user_chunks.append(np.fromiter(uids, dtype=np.int64, count=len(uids)))
+        day_chunks.append(analytics._day_numbers(dates))
+    return np.concatenate(user_chunks), np.concatenate(day_chunks)
+
+
+def measure(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        db.session.remove()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    db.session.remove()
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--workouts', type=int, default=500, help='Workouts per user.')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    seed(args.users, args.workouts)
+    with app.app_context():
+        rows = db.session.execute(select(func.count(Workout.id))).scalar()
+        print(f"db={app.config['SQLALCHEMY_DATABASE_URI'].split('@')[-1]} workouts={rows}")
+        orm = measure(orm_load, args.repeat)
+        raw = measure(analytics.load_workout_columns, args.repeat)
+        total = measure(analytics.compute, args.repeat)
+    print(f'load via ORM yield_per: {orm:6.2f} s')
+    print(f'load_workout_columns:   {raw:6.2f} s ({orm / raw:.1f}x faster)')
+    print(f'compute() total:        {total:6.2f} s')
+
+
+if __name__ == '__main__':
+    main()
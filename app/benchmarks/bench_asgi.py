@@ -0,0 +1,113 @@
+"""Compare concurrent read throughput of the WSGI app and the ASGI entry point.
+
+Seeds a throwaway database (a local SQLite file by default; point DATABASE_URL at a
+local Postgres to use that instead), logs in one user and fires the same mix of read
+requests at both paths with N requests in flight.
+
+    python -m app.benchmarks.bench_asgi --requests 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+os.environ.setdefault('INSTANCE_PATH', tempfile.mkdtemp(prefix='gym_bench_'))
+
+from app.app import app  # noqa: E402
+from app.models import db, User, Workout  # noqa: E402
+
+PATHS = ['/api/stats', '/api/calendar', '/api/workouts']
+
+
+def seed(workouts):
+    with app.app_context():
+        user = User.query.filter_by(username='bench').first()
+        if not user:
+            user = User(username='bench', email='bench@example.com')
+            user.set_password('bench')
+            db.session.add(user)
+            db.session.commit()
+            today = datetime.now()
+            db.session.add_all([
+                Workout(user_id=user.id, date=(today - timedelta(days=i)).strftime('%Y-%m-%d'), notes='')
+                for i in range(workouts)
+            ])
+            db.session.commit()
+
+
+def session_cookie():
+    client = app.test_client()
+    client.post('/login', data={'username': 'bench', 'password': 'bench'})
+    cookie = client.get_cookie(app.config.get('SESSION_COOKIE_NAME', 'session'))
+    return f'{cookie.key}={cookie.value}'
+
+
+def bench_wsgi(total, concurrency, cookie):
+    def worker(n):
+        client = app.test_client()
+        client.set_cookie(*cookie.split('=', 1))
+        for i in range(n):
+            resp = client.get(PATHS[i % len(PATHS)])
+            assert resp.status_code == 200, resp.status_code
+
+    per_worker = [total // concurrency] * concurrency
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, per_worker))
+    return sum(per_worker) / (time.perf_counter() - start)
+
+
+async def _asgi_get(application, path, cookie):
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+        'root_path': '', 'headers': [(b'host', b'localhost'), (b'cookie', cookie.encode())],
+        'client': ('127.0.0.1', 0), 'server': ('localhost', 80),
+    }
+    status = {}
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status['code'] = message['status']
+
+    await application(scope, receive, send)
+    assert status['code'] == 200, status
+
+
+async def bench_asgi(total, concurrency, cookie):
+    from app.asgi import application
+    queue = asyncio.Queue()
+    for i in range(total // concurrency * concurrency):
+        queue.put_nowait(PATHS[i % len(PATHS)])
+
+    async def worker():
+        while not queue.empty():
+            await _asgi_get(application, queue.get_nowait(), cookie)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return (total // concurrency * concurrency) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=1500)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--workouts', type=int, default=365)
+    args = parser.parse_args()
+
+    seed(args.workouts)
+    cookie = session_cookie()
+    print(f"db={app.config['SQLALCHEMY_DATABASE_URI'].split('@')[-1]} requests={args.requests} concurrency={args.concurrency}")
+    print(f'wsgi: {bench_wsgi(args.requests, args.concurrency, cookie):8.1f} req/s')
+    print(f'asgi: {asyncio.run(bench_asgi(args.requests, args.concurrency, cookie)):8.1f} req/s')
+
+
+if __name__ == '__main__':
+    main()
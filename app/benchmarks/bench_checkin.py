@@ -0,0 +1,134 @@
+"""Check-in correctness under concurrent submissions, and check-in throughput.
+
+Seeds a throwaway database (a local SQLite file by default; point DATABASE_URL at a
+local Postgres to use that instead) with users that already have a few weeks of
+history, then:
+
+1. fires --taps simultaneous check-ins for one user and verifies exactly one Workout row
+   was created and exactly one request succeeded;
+2. checks in --users different users with --concurrency requests in flight and reports
+   check-ins per second and SQL statements per check-in.
+
+    python -m app.benchmarks.bench_checkin --users 2000 --concurrency 16
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+os.environ.setdefault('INSTANCE_PATH', tempfile.mkdtemp(prefix='gym_bench_'))
+
+from sqlalchemy import event, insert, select  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+
+from app import bitmaps, rollups  # noqa: E402
+from app.app import app  # noqa: E402
+from app.models import db, User, Workout  # noqa: E402
+
+app.config['RATELIMIT_ENABLED'] = False
+
+_statements = 0
+_statements_lock = threading.Lock()
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _count_statement(*args):
+    global _statements
+    with _statements_lock:
+        _statements += 1
+
+
+def seed(users, history_days):
+    """Create `users` users named bench0.. with `history_days` days of workouts before today."""
+    with app.app_context():
+        if db.session.execute(select(User.id).where(User.username.like('bench%')).limit(1)).first():
+            # Check-ins are once per day, so a database that has already been benchmarked can't be reused
+            raise SystemExit('bench users already exist; run against an empty database')
+        db.session.execute(insert(User), [
+            {'username': f'bench{i}', 'email': f'bench{i}@example.com', 'password_hash': 'x'}
+            for i in range(users)
+        ])
+        ids = db.session.execute(
+            select(User.id).where(User.username.like('bench%')).order_by(User.id)
+        ).scalars().all()
+        today = datetime.now()
+        days = [(today - timedelta(days=d)).strftime('%Y-%m-%d') for d in range(1, history_days + 1)]
+        db.session.execute(insert(Workout), [
+            {'user_id': uid, 'date': day, 'notes': ''} for uid in ids for day in days
+        ])
+        # Build bitmaps and rollups up front so the benchmark measures steady-state check-ins
+        for uid in ids:
+            bitmaps.rebuild_user(uid)
+            rollups.rebuild_user(uid)
+        db.session.commit()
+        return ids
+
+
+def client_for(user_id):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(user_id)
+        sess['_fresh'] = True
+    return client
+
+
+def check_parallel_taps(user_id, taps):
+    """Submit `taps` check-ins for one user at the same moment; returns (successes, rows)."""
+    clients = [client_for(user_id) for _ in range(taps)]
+    barrier = threading.Barrier(taps)
+
+    def tap(client):
+        barrier.wait()
+        return client.post('/api/checkout-today', json={}).status_code
+
+    with ThreadPoolExecutor(max_workers=taps) as pool:
+        statuses = list(pool.map(tap, clients))
+    today = datetime.now().strftime('%Y-%m-%d')
+    with app.app_context():
+        rows = Workout.query.filter_by(user_id=user_id, date=today).count()
+    unexpected = [s for s in statuses if s not in (200, 400)]
+    assert not unexpected, f'unexpected responses: {unexpected}'
+    return statuses.count(200), rows
+
+
+def bench_checkins(user_ids, concurrency):
+    global _statements
+    clients = [client_for(uid) for uid in user_ids]
+
+    def checkin(client):
+        resp = client.post('/api/checkout-today', json={})
+        assert resp.status_code == 200, resp.status_code
+
+    _statements = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(checkin, clients))
+    elapsed = time.perf_counter() - start
+    return len(clients) / elapsed, _statements / len(clients)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--taps', type=int, default=16, help='Simultaneous check-ins for the race check.')
+    parser.add_argument('--history', type=int, default=60, help='Days of existing workouts per user.')
+    args = parser.parse_args()
+
+    user_ids = seed(args.users + 1, args.history)
+    print(f"db={app.config['SQLALCHEMY_DATABASE_URI'].split('@')[-1]} users={args.users} concurrency={args.concurrency}")
+
+    successes, rows = check_parallel_taps(user_ids[0], args.taps)
+    print(f'race check: {args.taps} parallel taps -> {successes} accepted, {rows} workout row(s)')
+    if successes != 1 or rows != 1:
+        raise SystemExit('FAILED: expected exactly one accepted check-in and one row')
+
+    rate, statements = bench_checkins(user_ids[1:], args.concurrency)
+    print(f'check-in: {rate:8.1f} req/s, {statements:.1f} SQL statements per check-in')
+
+
+if __name__ == '__main__':
+    main()
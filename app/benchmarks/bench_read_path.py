@@ -0,0 +1,123 @@
+"""Latency and memory of the ORM-free read path (app/queries.py) against the ORM.
+
+Seeds a throwaway database (a local SQLite file by default; point DATABASE_URL at a
+local Postgres to use that instead) with --users users of --workouts workouts each, then
+runs each read both ways inside an app context and reports the median time per call and
+the peak memory traced while building the result.
+
+    python -m app.benchmarks.bench_read_path --workouts 10000 --repeat 20
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+os.environ.setdefault('INSTANCE_PATH', tempfile.mkdtemp(prefix='gym_bench_'))
+
+from sqlalchemy import insert, select  # noqa: E402
+
+from app import bitmaps, queries  # noqa: E402
+from app.app import app  # noqa: E402
+from app.models import db, User, Workout  # noqa: E402
+
+
+def seed(users, workouts):
+    """Create `users` users named readbench0.. with `workouts` consecutive days of workouts."""
+    with app.app_context():
+        ids = db.session.execute(
+            select(User.id).where(User.username.like('readbench%')).order_by(User.id)
+        ).scalars().all()
+        if ids:
+            return ids
+        db.session.execute(insert(User), [
+            {'username': f'readbench{i}', 'email': f'readbench{i}@example.com', 'password_hash': 'x'}
+            for i in range(users)
+        ])
+        ids = db.session.execute(
+            select(User.id).where(User.username.like('readbench%')).order_by(User.id)
+        ).scalars().all()
+        first = date.today() - timedelta(days=workouts)
+        days = [(first + timedelta(days=d)).strftime('%Y-%m-%d') for d in range(workouts)]
+        for uid in ids:
+            db.session.execute(insert(Workout), [
+                {'user_id': uid, 'date': day, 'notes': f'note {i % 7}'} for i, day in enumerate(days)
+            ])
+            bitmaps.rebuild_user(uid)
+        db.session.commit()
+        return ids
+
+
+def orm_workouts(user_id):
+    return [{'date': w.date, 'notes': w.notes} for w in Workout.query.filter_by(user_id=user_id).all()]
+
+
+def core_workouts(user_id):
+    return [w.to_dict() for w in queries.workouts(user_id)]
+
+
+def orm_admin_users(user_id):
+    # The per-user loop admin_dashboard used before app/queries.py
+    stats = []
+    for u in User.query.order_by(User.username).all():
+        workouts = Workout.query.filter_by(user_id=u.id).order_by(Workout.date.asc()).all()
+        current_streak, best_streak = bitmaps.streaks(bitmaps.load_user_bitmaps(u.id)) if workouts else (0, 0)
+        stats.append({
+            'id': u.id, 'username': u.username, 'email': u.email, 'workouts': len(workouts),
+            'is_admin': u.is_admin, 'current_streak': current_streak, 'best_streak': best_streak,
+            'last_workout': workouts[-1].date if workouts else None,
+        })
+    return stats
+
+
+def core_admin_users(user_id):
+    return queries.admin_users()
+
+
+CASES = [
+    ('workouts', orm_workouts, core_workouts),
+    ('admin users', orm_admin_users, core_admin_users),
+]
+
+
+def measure(fn, user_id, repeat):
+    """(median seconds per call, peak traced bytes) for `fn(user_id)` on a fresh session."""
+    times = []
+    for _ in range(repeat):
+        db.session.remove()
+        start = time.perf_counter()
+        fn(user_id)
+        times.append(time.perf_counter() - start)
+    # Measure memory separately: tracing slows allocation-heavy code far more than the rest
+    db.session.remove()
+    tracemalloc.start()
+    result = fn(user_id)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    db.session.remove()
+    return statistics.median(times), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=5)
+    parser.add_argument('--workouts', type=int, default=10000, help='Workouts per user.')
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    user_ids = seed(args.users, args.workouts)
+    print(f"db={app.config['SQLALCHEMY_DATABASE_URI'].split('@')[-1]} users={len(user_ids)} workouts/user={args.workouts}")
+    with app.app_context():
+        for name, orm, core in CASES:
+            orm_time, orm_peak = measure(orm, user_ids[0], args.repeat)
+            core_time, core_peak = measure(core, user_ids[0], args.repeat)
+            print(f'{name:12} orm: {orm_time * 1000:8.1f} ms {orm_peak / 1024:9.0f} KiB peak   '
+                  f'core: {core_time * 1000:8.1f} ms {core_peak / 1024:9.0f} KiB peak   '
+                  f'({orm_time / core_time:.1f}x faster, {orm_peak / max(core_peak, 1):.1f}x less memory)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""Import-time report for a serverless cold start that serves /api/stats.
+
+Runs fresh interpreters under `python -X importtime` that import the WSGI app the way
+api/index.py does on a cold start, sign a user in and request /api/stats. It then
+reports where the import time went in the median run and whether any of the lazily
+loaded modules were imported anyway. The report for the current tree is checked in as import_time_report.txt.
+
+    python -m app.benchmarks.import_time            # print the report
+    python -m app.benchmarks.import_time --write    # refresh import_time_report.txt
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPORT_PATH = os.path.join(os.path.dirname(__file__), 'import_time_report.txt')
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Modules a cold start serving /api/stats should not need
+LAZY_MODULES = [
+    'app.views.admin.dashboard',
+    'app.views.admin.users',
+    'app.views.admin.audit',
+    'app.views.admin.impersonation',
+    'app.admin_batch',
+    'app.analytics',
+    'app.provisioning',
+    'app.recompute',
+    'app.streaks',
+    'numpy',
+    'cProfile',
+    'pstats',
+    # Needed on PostgreSQL deployments, where the engine loads it anyway
+    'sqlalchemy.dialects.postgresql',
+]
+
+CHILD = r'''
+import json, sys, time
+start = time.perf_counter()
+from app.app import app
+imported = time.perf_counter()
+
+from sqlalchemy import insert, select
+from app.models import db, User
+app.config['RATELIMIT_ENABLED'] = False
+with app.app_context():
+    db.session.execute(insert(User).values(username='coldstart', email='coldstart@example.com', password_hash='x'))
+    user_id = db.session.execute(select(User.id).where(User.username == 'coldstart')).scalar()
+    db.session.commit()
+client = app.test_client()
+with client.session_transaction() as sess:
+    sess['_user_id'] = str(user_id)
+ready = time.perf_counter()
+resp = client.get('/api/stats')
+assert resp.status_code == 200, resp.status_code
+served = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'request_ms': (served - ready) * 1000,
+    'modules': sorted(sys.modules),
+}))
+'''
+
+LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)')
+
+
+def run_child():
+    env = dict(os.environ, INSTANCE_PATH=tempfile.mkdtemp(prefix='gym_importtime_'), PYTHONPATH=ROOT)
+    env.pop('DATABASE_URL', None)
+    env.pop('DATABASE_READ_URL', None)
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=False,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(proc.stderr[-2000:])
+    entries = []
+    for line in proc.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return entries, json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def run_median(runs):
+    """The run with the median import time; single cold starts are noisy."""
+    results = sorted((run_child() for _ in range(runs)), key=lambda r: r[1]['import_ms'])
+    return results[len(results) // 2], statistics.median(r[1]['request_ms'] for r in results)
+
+
+def report(entries, result, top):
+    total_ms = sum(self_us for _, self_us, _, _ in entries) / 1000
+    top_level = sorted((e for e in entries if e[3] == 0), key=lambda e: e[2], reverse=True)
+    own = sorted((e for e in entries if e[0] == 'app' or e[0].startswith('app.')), key=lambda e: e[2], reverse=True)
+    loaded = set(result['modules'])
+
+    lines = [
+        'Cold start serving GET /api/stats (python -m app.benchmarks.import_time)',
+        f'python {platform.python_version()}, SQLite, no optional features enabled',
+        '',
+        f'import app.app:        {result["import_ms"]:8.1f} ms wall (median of {result["runs"]} runs)',
+        f'first /api/stats:      {result["request_ms"]:8.1f} ms wall',
+        f'modules imported:      {len(entries):8d} ({total_ms:.1f} ms self time under -X importtime)',
+        '',
+        f'Top {top} top-level imports by cumulative time (ms):',
+    ]
+    lines += [f'  {cumulative / 1000:8.1f}  {name}' for name, _, cumulative, _ in top_level[:top]]
+    lines += ['', 'Application modules (self / cumulative ms):']
+    lines += [f'  {self_us / 1000:6.1f} / {cumulative / 1000:6.1f}  {name}' for name, self_us, cumulative, _ in own]
+    lines += ['', 'Lazily loaded modules:']
+    lines += [f'  {"LOADED " if name in loaded else "not loaded"}  {name}' for name in LAZY_MODULES]
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=7, help='Cold starts to measure.')
+    parser.add_argument('--top', type=int, default=15, help='Top-level imports to list.')
+    parser.add_argument('--write', action='store_true', help=f'Write the report to {os.path.basename(REPORT_PATH)}.')
+    args = parser.parse_args()
+
+    (entries, result), request_ms = run_median(args.runs)
+    result.update(request_ms=request_ms, runs=args.runs)
+    text = report(entries, result, args.top)
+    print(text, end='')
+    if args.write:
+        with open(REPORT_PATH, 'w') as f:
+            f.write(text)
+    eager = [name for name in LAZY_MODULES if name in result['modules']]
+    if eager:
+        raise SystemExit(f'lazily loaded modules were imported: {", ".join(eager)}')
+
+
+if __name__ == '__main__':
+    main()
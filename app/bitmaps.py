@@ -0,0 +1,216 @@
+"""Per-user workout-day bitmaps.
+
+Each (user, year) pair is stored as a 366-bit little-endian bitmap where bit N is set when
+the user worked out on day-of-year N+1. Calendar lookups become bit slices, weekly and
+monthly counts become popcounts, and streaks come from run-length scans over the years
+joined into one integer (Python ints operate on whole machine words internally).
+
+The bitmaps are maintained alongside `Workout` rows by `mark_workout()`; `rebuild_user()`
+/ `flask rebuild-bitmaps` regenerate them from the rows. Reads never write: until a user's
+bitmaps are stored, `load_user_bitmaps()` computes them from the rows.
+"""
+import base64
+import calendar
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import delete, select
+
+from app.models import db, Workout, WorkoutBitmap
+
+YEAR_BITS = 366
+YEAR_BYTES = (YEAR_BITS + 7) // 8
+# Row-scan streaks only walk back a year from today; keep bitmap results identical.
+MAX_CURRENT_STREAK = 365
+
+
+def _parse(day):
+    return day if isinstance(day, date) else datetime.strptime(day, '%Y-%m-%d').date()
+
+
+def day_index(day):
+    return day.timetuple().tm_yday - 1
+
+
+def to_bytes(value):
+    return value.to_bytes(YEAR_BYTES, 'little')
+
+
+def from_bytes(bits):
+    return int.from_bytes(bits or b'', 'little')
+
+
+def bitmaps_from_dates(workout_dates):
+    """Build {year: int bitmap} from an iterable of 'YYYY-MM-DD' strings."""
+    years = {}
+    for d in workout_dates:
+        day = _parse(d)
+        years[day.year] = years.get(day.year, 0) | (1 << day_index(day))
+    return years
+
+
+def _popcount(n):
+    return bin(n).count('1')
+
+
+def _mask(n):
+    return (1 << n) - 1 if n > 0 else 0
+
+
+def timeline(years):
+    """Join {year: bitmap} into one int; returns (value, date of bit 0)."""
+    if not years:
+        return 0, None
+    base = date(min(years), 1, 1)
+    value = 0
+    for year, bits in years.items():
+        days = 366 if calendar.isleap(year) else 365
+        value |= (bits & _mask(days)) << (date(year, 1, 1) - base).days
+    return value, base
+
+
+def count_range(years, start, end):
+    """Number of workout days between `start` and `end` inclusive."""
+    value, base = timeline(years)
+    if base is None or end < start:
+        return 0
+    lo = max((start - base).days, 0)
+    hi = (end - base).days
+    if hi < 0:
+        return 0
+    return _popcount((value >> lo) & _mask(hi - lo + 1))
+
+
+def month_days(years, year, month):
+    """Day-of-month numbers with a workout in the given month."""
+    start = day_index(date(year, month, 1))
+    chunk = (years.get(year, 0) >> start) & _mask(calendar.monthrange(year, month)[1])
+    return [i + 1 for i in range(chunk.bit_length()) if chunk >> i & 1]
+
+
+def run_ending_at(years, day):
+    """Length of the run of consecutive workout days ending at `day` (0 if none)."""
+    value, base = timeline(years)
+    if base is None:
+        return 0
+    idx = (day - base).days
+    if idx < 0 or not (value >> idx) & 1:
+        return 0
+    gaps = ~value & _mask(idx + 1)
+    run = idx + 1 if not gaps else idx - (gaps.bit_length() - 1)
+    return min(run, MAX_CURRENT_STREAK)
+
+
+def longest_run(years):
+    value, _ = timeline(years)
+    best = 0
+    while value:
+        value >>= (value & -value).bit_length() - 1  # skip zeros
+        ones = ((value ^ (value + 1)) >> 1).bit_length()  # count trailing ones
+        best = max(best, ones)
+        value >>= ones
+    return best
+
+
+def total_days(years):
+    return sum(_popcount(bits) for bits in years.values())
+
+
+def streaks(years, now=None):
+    """(current_streak, best_streak), matching streaks.compute_streaks()."""
+    today = (now or datetime.now()).date()
+    return run_ending_at(years, today), longest_run(years)
+
+
+def build_stats(years, now=None):
+    """The /api/stats payload, computed with popcounts and run scans."""
+    now = now or datetime.now()
+    today = now.date()
+    week_start = today - timedelta(days=today.weekday())
+    month_start = today.replace(day=1)
+    far_future = date(max(years) if years else today.year, 12, 31)
+
+    weeks_data = [
+        count_range(years, week_start - timedelta(days=i*7), week_start - timedelta(days=i*7 - 6))
+        for i in range(4)
+    ]
+    current_streak, best_streak = streaks(years, now)
+    if current_streak == 0:
+        display_streak = run_ending_at(years, today - timedelta(days=1))
+    else:
+        display_streak = current_streak
+
+    return {
+        'total_workouts': total_days(years),
+        'this_week': count_range(years, week_start, far_future),
+        'this_month': count_range(years, month_start, date(today.year, today.month, calendar.monthrange(today.year, today.month)[1])),
+        'avg_per_week': round(sum(weeks_data) / len(weeks_data), 1),
+        'current_streak': current_streak,
+        'display_streak': display_streak,
+        'best_streak': best_streak,
+        'today_logged': bool((years.get(today.year, 0) >> day_index(today)) & 1)
+    }
+
+
+def encode_year(years, year):
+    """Base64 of the year's 46-byte bitmap (bit N of the little-endian value = day N+1)."""
+    return base64.b64encode(to_bytes(years.get(year, 0))).decode('ascii')
+
+
+# ---- Persistence ----
+
+def load_user_bitmaps(user_id):
+    """Return {year: int bitmap} for a user.
+
+    Users without stored bitmaps get them computed from their Workout rows without saving;
+    their next check-in or `flask rebuild-bitmaps --missing` stores them.
+    """
+    rows = db.session.execute(
+        select(WorkoutBitmap.year, WorkoutBitmap.bits).where(WorkoutBitmap.user_id == user_id)
+    ).all()
+    if rows:
+        return {year: from_bytes(bits) for year, bits in rows}
+    dates = db.session.execute(select(Workout.date).where(Workout.user_id == user_id)).scalars()
+    return bitmaps_from_dates(dates)
+
+
+def mark_workout(user_id, workout_date, present=True):
+    """Set or clear a day in the user's bitmap (joins the caller's transaction).
+
+    Returns the user's updated {year: int bitmap}, so callers can compute streaks
+    without reading the bitmaps again.
+    """
+    day = _parse(workout_date)
+    rows = {row.year: row for row in WorkoutBitmap.query.filter_by(user_id=user_id)}
+    if not rows:
+        # First bitmap for this user: build the history from existing rows (which include this change)
+        years = rebuild_user(user_id)
+        db.session.flush()
+        return years
+    years = {year: from_bytes(row.bits) for year, row in rows.items()}
+    value = years.get(day.year, 0)
+    if present:
+        value |= 1 << day_index(day)
+    else:
+        value &= ~(1 << day_index(day))
+    years[day.year] = value
+    if day.year in rows:
+        rows[day.year].bits = to_bytes(value)
+    elif present:
+        db.session.add(WorkoutBitmap(user_id=user_id, year=day.year, bits=to_bytes(value)))
+    return years
+
+
+def rebuild_user(user_id):
+    """Regenerate a user's bitmaps from Workout rows (caller commits)."""
+    dates = db.session.execute(select(Workout.date).where(Workout.user_id == user_id)).scalars().all()
+    years = bitmaps_from_dates(dates)
+    db.session.execute(delete(WorkoutBitmap).where(WorkoutBitmap.user_id == user_id))
+    if years:
+        db.session.add_all([
+            WorkoutBitmap(user_id=user_id, year=year, bits=to_bytes(bits)) for year, bits in years.items()
+        ])
+    return years
+
+
+def delete_user(user_id):
+    db.session.execute(delete(WorkoutBitmap).where(WorkoutBitmap.user_id == user_id))
@@ -0,0 +1,161 @@
+"""`flask` CLI commands; registered on the app by create_app()."""
+import os
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from app import bitmaps, jobs, rollups
+from app.models import db, AuditLog, MonthlyWorkoutCount, User, Workout, WorkoutBitmap
+
+
+@click.command('provision-users')
+@with_appcontext
+@click.argument('csv_path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--batch-size', default=None, type=int, help='Users inserted per transaction.')
+@click.option('--workers', default=None, type=int, help='Password hashing processes (default: all cores).')
+@click.option('--passwords-out', type=click.Path(dir_okay=False), help='Write generated temporary passwords to this CSV.')
+def provision_users_command(csv_path, batch_size, workers, passwords_out):
+    """Create users in bulk from a CSV of gym members (username,email[,password])."""
+    import csv
+    from app.provisioning import read_members_csv, provision_users
+    with open(csv_path, newline='', encoding='utf-8-sig') as f:
+        members, errors = read_members_csv(f)
+    for line, msg in errors:
+        click.echo(f'line {line}: {msg}', err=True)
+
+    def progress(done, total):
+        click.echo(f'provisioned {done}/{total}')
+
+    result = provision_users(
+        members,
+        batch_size=batch_size or current_app.config['PROVISION_BATCH_SIZE'],
+        workers=workers or current_app.config['PROVISION_WORKERS'],
+        progress=progress,
+    )
+    db.session.add(AuditLog(actor_id=None, action='provision_users', details=f'created={result["created"]} skipped={len(result["skipped"])} source=cli'))
+    db.session.commit()
+
+    if passwords_out and result['temp_passwords']:
+        with open(passwords_out, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['username', 'password'])
+            writer.writerows(result['temp_passwords'].items())
+    click.echo(f"created={result['created']} skipped={len(result['skipped'])} errors={len(errors)}")
+
+@click.command('build-assets')
+@with_appcontext
+def build_assets_command():
+    """Minify and fingerprint static JS/CSS into static/dist/ (with .gz/.br variants)."""
+    from app.assets import build_assets
+    for logical, hashed in build_assets(current_app.static_folder).items():
+        click.echo(f'{logical} -> {hashed}')
+
+@click.command('rebuild-bitmaps')
+@with_appcontext
+@click.option('--user-id', type=int, help='Only this user (default: everyone).')
+@click.option('--check', is_flag=True, help='Compare bitmaps with a row scan instead of rebuilding.')
+@click.option('--missing', is_flag=True, help='Only users with workouts but no stored bitmaps.')
+def rebuild_bitmaps_command(user_id, check, missing):
+    """Rebuild workout-day bitmaps from Workout rows, or verify they agree."""
+    from app.streaks import build_stats
+    user_ids = [user_id] if user_id else [uid for (uid,) in db.session.query(User.id).order_by(User.id)]
+    if missing:
+        stored = set(db.session.execute(db.select(WorkoutBitmap.user_id).distinct()).scalars())
+        active = set(db.session.execute(db.select(Workout.user_id).distinct()).scalars())
+        user_ids = [uid for uid in user_ids if uid in active and uid not in stored]
+    mismatches = 0
+    for uid in user_ids:
+        if check:
+            dates = sorted({w.date for w in Workout.query.filter_by(user_id=uid).all()})
+            from_rows = build_stats(dates)
+            from_bits = bitmaps.build_stats(bitmaps.load_user_bitmaps(uid))
+            if from_rows != from_bits:
+                mismatches += 1
+                click.echo(f'user {uid}: rows={from_rows} bitmaps={from_bits}', err=True)
+        else:
+            bitmaps.rebuild_user(uid)
+            db.session.commit()
+    click.echo(f'{"checked" if check else "rebuilt"} {len(user_ids)} users, {mismatches} mismatches')
+
+@click.command('rebuild-rollups')
+@with_appcontext
+@click.option('--user-id', type=int, help='Only this user (default: everyone).')
+@click.option('--batch-size', default=200, help='Users per transaction.')
+@click.option('--missing', is_flag=True, help='Only users with workouts but no stored rollups.')
+def rebuild_rollups_command(user_id, batch_size, missing):
+    """Rebuild weekly/monthly workout rollups from Workout rows."""
+    user_ids = [user_id] if user_id else [uid for (uid,) in db.session.query(User.id).order_by(User.id)]
+    if missing:
+        stored = set(db.session.execute(db.select(MonthlyWorkoutCount.user_id).distinct()).scalars())
+        active = set(db.session.execute(db.select(Workout.user_id).distinct()).scalars())
+        user_ids = [uid for uid in user_ids if uid in active and uid not in stored]
+    for i in range(0, len(user_ids), batch_size):
+        for uid in user_ids[i:i + batch_size]:
+            rollups.rebuild_user(uid)
+        db.session.commit()
+        click.echo(f'rebuilt {min(i + batch_size, len(user_ids))}/{len(user_ids)} users')
+
+@click.command('recompute-all')
+@with_appcontext
+@click.option('--workers', default=None, type=int, help='Worker processes (default: all cores).')
+@click.option('--shard-size', default=5000, help='Users per shard handed to a worker.')
+@click.option('--batch-size', default=1000, help='Users read and written per transaction.')
+@click.option('--checkpoint', 'checkpoint_path', type=click.Path(dir_okay=False),
+              help='Checkpoint file (default: recompute-checkpoint.json in the instance folder).')
+@click.option('--resume', is_flag=True, help='Skip shards finished by an earlier, interrupted run.')
+@click.option('--dry-run', is_flag=True, help='Only report what would change.')
+def recompute_all_command(workers, shard_size, batch_size, checkpoint_path, resume, dry_run):
+    """Recompute bitmaps, rollups and milestone badges for every user in parallel."""
+    from app.recompute import recompute_all, worker_database_url
+    checkpoint_path = checkpoint_path or os.path.join(current_app.instance_path, 'recompute-checkpoint.json')
+
+    def progress(done, total, summary):
+        lo, hi = summary['shard']
+        click.echo(f'shard {done}/{total} (users {lo}-{hi}): {summary["changed_users"]}/{summary["users"]} changed')
+
+    # Workers build their own engines, so hand them a URL rather than the engine options
+    database_url = worker_database_url(db.engine, current_app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    try:
+        result = recompute_all(
+            database_url, checkpoint_path, shard_size=shard_size, batch_size=batch_size,
+            workers=workers, dry_run=dry_run, resume=resume, progress=progress,
+        )
+    except Exception:
+        if not dry_run:
+            click.echo(f'recompute interrupted; rerun with --resume to continue from {checkpoint_path}', err=True)
+        raise
+
+    for line in result['diffs']:
+        click.echo(line)
+    rows = ' '.join(f'{name}={count}' for name, count in result['rows'].items())
+    if not dry_run and result['shards']:
+        db.session.add(AuditLog(actor_id=None, action='recompute_all', details=f'users={result["users"]} changed={result["changed_users"]} {rows}'))
+        db.session.commit()
+    click.echo(f'{"would change" if dry_run else "changed"} {result["changed_users"]}/{result["users"]} users '
+               f'({rows}); skipped {result["skipped_shards"]} finished shards')
+
+@click.command('run-jobs')
+@with_appcontext
+@click.option('--concurrency', default=2, help='Worker threads.')
+@click.option('--poll-interval', default=1.0, help='Seconds to sleep when the queue is empty.')
+@click.option('--once', is_flag=True, help='Exit once the queue is drained.')
+def run_jobs_command(concurrency, poll_interval, once):
+    """Run a background job worker."""
+    click.echo(f'job worker started (concurrency={concurrency})')
+    jobs.run_worker(current_app._get_current_object(), concurrency=concurrency, poll_interval=poll_interval, once=once)
+
+
+COMMANDS = [
+    provision_users_command,
+    build_assets_command,
+    rebuild_bitmaps_command,
+    rebuild_rollups_command,
+    recompute_all_command,
+    run_jobs_command,
+]
+
+
+def register_commands(app):
+    for command in COMMANDS:
+        app.cli.add_command(command)
@@ -0,0 +1,80 @@
+"""gzip (and optional brotli) response compression.
+
+Responses are compressed in an `after_request` hook when the client accepts an encoding,
+the body is at least COMPRESS_MIN_SIZE bytes and the mimetype is in COMPRESS_MIMETYPES.
+Streamed / passthrough responses and responses that already carry a Content-Encoding are
+left alone. Brotli is used only if the `brotli` package is installed.
+"""
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+DEFAULT_MIMETYPES = [
+    'text/html',
+    'text/css',
+    'text/plain',
+    'text/csv',
+    'application/json',
+    'application/javascript',
+    'text/javascript',
+    'image/svg+xml',
+]
+
+
+def choose_encoding(accept_encodings, allow_brotli=True):
+    """Pick the best supported encoding from the request's Accept-Encoding, or None."""
+    candidates = ['br', 'gzip'] if allow_brotli and brotli is not None else ['gzip']
+    best, best_q = None, 0
+    for enc in candidates:
+        q = accept_encodings[enc]  # honours q-values and '*'
+        if q > best_q:
+            best, best_q = enc, q
+    return best
+
+
+def compress(data, encoding, level):
+    if encoding == 'br':
+        # brotli quality runs 0-11; map the gzip-style 1-9 level onto it
+        return brotli.compress(data, quality=min(11, max(0, round(level * 11 / 9))))
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def init_compression(app):
+    app.config.setdefault('COMPRESS_ENABLED', True)
+    app.config.setdefault('COMPRESS_MIN_SIZE', 500)
+    app.config.setdefault('COMPRESS_LEVEL', 6)
+    app.config.setdefault('COMPRESS_BROTLI', True)
+    app.config.setdefault('COMPRESS_MIMETYPES', DEFAULT_MIMETYPES)
+
+    @app.after_request
+    def compress_response(response):
+        cfg = app.config
+        if not cfg['COMPRESS_ENABLED']:
+            return response
+        if (response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or response.status_code < 200 or response.status_code in (204, 206, 304)
+                or response.mimetype not in cfg['COMPRESS_MIMETYPES']):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = choose_encoding(request.accept_encodings, cfg['COMPRESS_BROTLI'])
+        if encoding is None:
+            return response
+        data = response.get_data()
+        if len(data) < cfg['COMPRESS_MIN_SIZE']:
+            return response
+
+        response.set_data(compress(data, encoding, cfg['COMPRESS_LEVEL']))
+        response.headers['Content-Encoding'] = encoding
+        if response.headers.get('ETag'):
+            # A strong ETag belongs to the identity representation only
+            response.set_etag(response.get_etag()[0], weak=True)
+        return response
+
+    return app
@@ -0,0 +1,141 @@
+"""Configuration read from the environment (the variables are listed under "Configuration" in the README)."""
+import os
+from datetime import timedelta
+from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+
+
+def normalize_database_url(database_url):
+    """Rewrite a DATABASE_URL for SQLAlchemy + pg8000; returns (url, engine_options)."""
+    # Parse URL to extract sslmode and other query params
+    parsed = urlparse(database_url)
+    if not parsed.scheme.startswith('postgres'):
+        # e.g. local SQLite files; urlunparse would mangle sqlite:////absolute/paths
+        return database_url, {}
+    qs = parse_qs(parsed.query)
+    sslmode = qs.pop('sslmode', None)
+
+    # Rebuild query string without sslmode (pg8000 doesn't accept sslmode kwarg)
+    new_query = urlencode(qs, doseq=True)
+
+    # Convert scheme to use pg8000 driver when appropriate
+    scheme = parsed.scheme
+    if scheme == 'postgres':
+        scheme = 'postgresql+pg8000'
+    elif scheme == 'postgresql' and '+pg8000' not in database_url:
+        scheme = 'postgresql+pg8000'
+
+    new_parsed = parsed._replace(scheme=scheme, query=new_query)
+    database_url = urlunparse(new_parsed)
+
+    # If sslmode was present and not 'disable', configure an SSLContext for pg8000
+    # pg8000 expects an `ssl_context` object rather than an `ssl` boolean or `sslmode` kwarg.
+    engine_options = {}
+    if sslmode and sslmode[0].lower() != 'disable':
+        try:
+            import ssl
+            ssl_context = ssl.create_default_context()
+            # Note: You can adjust verification here if your provider requires special cert handling.
+            # Add a short connect timeout to avoid long hangs during init in serverless environments.
+            engine_options['connect_args'] = {'ssl_context': ssl_context, 'timeout': 5}
+        except Exception as e:
+            # If SSL context creation fails, log and continue; don't let app crash during import
+            # We'll still set the database URL but the connection may fail until fixed.
+            print('Warning: failed to create SSL context for DB connections:', e)
+
+    return database_url, engine_options
+
+
+def load_config(app):
+    database_url = os.environ.get('DATABASE_URL')
+    if database_url:
+        database_url, engine_options = normalize_database_url(database_url)
+        if engine_options:
+            app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
+
+        app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    else:
+        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///gym_streak.db'
+
+    # Optional read replica: read-only GET views are routed here (see app/replica.py)
+    database_read_url = os.environ.get('DATABASE_READ_URL')
+    if database_read_url:
+        database_read_url, read_engine_options = normalize_database_url(database_read_url)
+        app.config['SQLALCHEMY_BINDS'] = {'replica': {'url': database_read_url, **read_engine_options}}
+    app.config['REPLICA_STICKY_SECONDS'] = int(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+
+    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+    # Remember-me cookie configuration (use env var FORCE_HTTPS=true in production to enforce Secure flag)
+    app.config['REMEMBER_COOKIE_DURATION'] = timedelta(days=30)
+    app.config['REMEMBER_COOKIE_HTTPONLY'] = True
+    app.config['REMEMBER_COOKIE_SAMESITE'] = 'Lax'
+    app.config['REMEMBER_COOKIE_SECURE'] = os.environ.get('FORCE_HTTPS', 'false').lower() == 'true'
+
+    # Bulk provisioning: users per insert batch and password hashing processes (default: all cores)
+    app.config['PROVISION_BATCH_SIZE'] = int(os.environ.get('PROVISION_BATCH_SIZE', 500))
+    app.config['PROVISION_WORKERS'] = int(os.environ.get('PROVISION_WORKERS', 0)) or None
+    # /api/admin/provision hashes inline in the request, so it takes small CSVs only;
+    # larger imports go through `flask provision-users`
+    app.config['PROVISION_INLINE_MAX'] = int(os.environ.get('PROVISION_INLINE_MAX', 200))
+
+    # Background jobs: when disabled, deferred work runs inline in the request
+    app.config['JOB_QUEUE_ENABLED'] = os.environ.get('JOB_QUEUE_ENABLED', 'false').lower() == 'true'
+    app.config['JOB_VISIBILITY_TIMEOUT'] = int(os.environ.get('JOB_VISIBILITY_TIMEOUT', 300))
+    app.config['JOB_MAX_ATTEMPTS'] = int(os.environ.get('JOB_MAX_ATTEMPTS', 5))
+
+    # Response compression (gzip, plus brotli when the `brotli` package is installed)
+    app.config['COMPRESS_ENABLED'] = os.environ.get('COMPRESS_ENABLED', 'true').lower() == 'true'
+    app.config['COMPRESS_MIN_SIZE'] = int(os.environ.get('COMPRESS_MIN_SIZE', 500))
+    app.config['COMPRESS_LEVEL'] = int(os.environ.get('COMPRESS_LEVEL', 6))
+
+    # /api/admin/batch: operations accepted per request and applied per transaction
+    app.config['ADMIN_BATCH_MAX_OPS'] = int(os.environ.get('ADMIN_BATCH_MAX_OPS', 10000))
+    app.config['ADMIN_BATCH_CHUNK_SIZE'] = int(os.environ.get('ADMIN_BATCH_CHUNK_SIZE', 500))
+    # reset_password items are hashed in the request (~0.1 s each), so they get a much lower cap
+    app.config['ADMIN_BATCH_MAX_RESETS'] = int(os.environ.get('ADMIN_BATCH_MAX_RESETS', 50))
+
+    # Admin analytics results are cached for this many seconds
+    app.config['ANALYTICS_CACHE_SECONDS'] = int(os.environ.get('ANALYTICS_CACHE_SECONDS', 300))
+
+    # Request profiling (off unless a trigger is set): profile a random fraction of requests, requests
+    # from admins carrying PROFILE_HEADER: 1, and/or every request to PROFILE_ENDPOINTS (comma-separated)
+    app.config['PROFILE_SAMPLE_RATE'] = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+    app.config['PROFILE_HEADER'] = os.environ.get('PROFILE_HEADER') or None
+    app.config['PROFILE_ENDPOINTS'] = os.environ.get('PROFILE_ENDPOINTS', '')
+    app.config['PROFILE_MAX_FILES'] = int(os.environ.get('PROFILE_MAX_FILES', 50))
+
+    # Rate limiting: token-bucket rules are '<requests>/<seconds>' per client IP (and per share token);
+    # RATELIMIT_CONCURRENCY caps requests in flight per endpoint before shedding with 503.
+    # RATELIMIT_TRUSTED_PROXIES is how many proxies append to X-Forwarded-For (1 on Vercel);
+    # the older RATELIMIT_TRUST_PROXY=true means one
+    app.config['RATELIMIT_ENABLED'] = os.environ.get('RATELIMIT_ENABLED', 'true').lower() == 'true'
+    app.config['RATELIMIT_STORAGE_URL'] = os.environ.get('RATELIMIT_STORAGE_URL')
+    trust_proxy = os.environ.get('RATELIMIT_TRUST_PROXY', 'false').lower() == 'true'
+    app.config['RATELIMIT_TRUSTED_PROXIES'] = int(os.environ.get('RATELIMIT_TRUSTED_PROXIES', int(trust_proxy)))
+    app.config['RATELIMIT_MAX_KEYS'] = int(os.environ.get('RATELIMIT_MAX_KEYS', 10000))
+    app.config['RATELIMIT_RULES'] = {
+        'login': os.environ.get('RATELIMIT_LOGIN', '10/60'),
+        'signup': os.environ.get('RATELIMIT_SIGNUP', '5/300'),
+        'share': os.environ.get('RATELIMIT_SHARE', '120/60'),
+    }
+    app.config['RATELIMIT_CONCURRENCY'] = {
+        'login': int(os.environ.get('RATELIMIT_LOGIN_CONCURRENCY', 8)),
+        'signup': int(os.environ.get('RATELIMIT_SIGNUP_CONCURRENCY', 4)),
+        'share': int(os.environ.get('RATELIMIT_SHARE_CONCURRENCY', 16)),
+    }
+
+
+def log_db_config(app):
+    """Startup diagnostic logging (redacts credentials)."""
+    try:
+        parsed_final = urlparse(app.config.get('SQLALCHEMY_DATABASE_URI', ''))
+        host_info = parsed_final.hostname or ''
+        if parsed_final.port:
+            host_info = f"{host_info}:{parsed_final.port}"
+        app.logger.info('DB config - scheme=%s host=%s', parsed_final.scheme, host_info)
+        engine_opts = app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}
+        has_ssl_context = bool(engine_opts.get('connect_args') and engine_opts['connect_args'].get('ssl_context'))
+        app.logger.info('DB engine options present=%s ssl_context=%s', bool(engine_opts), has_ssl_context)
+    except Exception:
+        app.logger.exception('Failed to log DB startup diagnostics')
@@ -0,0 +1,12 @@
+"""Extension instances shared by the blueprints; bound to the app in create_app()."""
+from datetime import timedelta
+
+from flask_login import LoginManager
+
+from app.ratelimit import Limiter
+
+login_manager = LoginManager()
+login_manager.remember_cookie_duration = timedelta(days=30)
+login_manager.login_view = 'auth.login'
+
+limiter = Limiter()
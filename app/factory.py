@@ -0,0 +1,46 @@
+"""Application factory."""
+import os
+import tempfile
+
+from flask import Flask
+
+from app.assets import init_assets
+from app.compression import init_compression
+from app.config import load_config, log_db_config
+from app.extensions import limiter, login_manager
+from app.models import db
+from app.profiler import init_profiler
+from app.replica import init_read_replica
+from app.sync import init_sync
+
+
+def create_app():
+    # Ensure Flask instance path is writable in serverless/read-only deployments
+    instance_path = os.environ.get('INSTANCE_PATH') or os.path.join(tempfile.gettempdir(), 'gym_streak_instance')
+    os.makedirs(instance_path, exist_ok=True)
+    app = Flask(__name__, instance_path=instance_path, instance_relative_config=True)
+    load_config(app)
+
+    # Initialize extensions
+    db.init_app(app)
+    login_manager.init_app(app)
+    init_compression(app)
+    init_assets(app)
+    init_read_replica(app)
+    limiter.init_app(app)
+    init_profiler(app)
+    init_sync(app)
+
+    from app import tasks  # noqa: F401  (registers the background job handlers)
+    from app.cli import register_commands
+    from app.views import register_blueprints
+    register_blueprints(app)
+    register_commands(app)
+
+    log_db_config(app)
+    from app.schema import init_db
+    try:
+        init_db(app)
+    except Exception:
+        app.logger.exception('init_db failed during startup')
+    return app
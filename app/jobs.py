@@ -0,0 +1,167 @@
+"""Small DB-backed job queue for work that shouldn't run inside a request.
+
+Jobs live in the `job` table. Workers claim a job by moving it to `running` with a
+`locked_until` visibility timeout; a job whose worker died becomes claimable again once
+that timeout passes. Failed jobs are retried with exponential backoff until
+`max_attempts` is reached.
+
+When JOB_QUEUE_ENABLED is off (the default, e.g. on serverless deployments without a
+worker) `defer()` simply runs the handler inline.
+"""
+import json
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import and_, func, or_, select, update
+
+from app.models import db, Job
+
+_handlers = {}
+
+
+def handler(kind):
+    """Register a function as the handler for jobs of `kind`."""
+    def decorator(fn):
+        _handlers[kind] = fn
+        return fn
+    return decorator
+
+
+def enqueue(kind, delay=0, max_attempts=None, **payload):
+    """Add a job to the current session; it is queued when the caller commits."""
+    if kind not in _handlers:
+        raise ValueError(f'unknown job kind: {kind}')
+    job = Job(
+        kind=kind,
+        payload=json.dumps(payload),
+        run_after=datetime.utcnow() + timedelta(seconds=delay),
+        max_attempts=max_attempts or current_app.config['JOB_MAX_ATTEMPTS'],
+    )
+    db.session.add(job)
+    return job
+
+
+def defer(kind, **payload):
+    """Queue `kind` when the job queue is enabled, otherwise run it right away."""
+    if current_app.config.get('JOB_QUEUE_ENABLED'):
+        return enqueue(kind, **payload)
+    _handlers[kind](**payload)
+    return None
+
+
+def _claimable(now):
+    return and_(
+        Job.attempts < Job.max_attempts,
+        or_(
+            and_(Job.status == 'queued', Job.run_after <= now),
+            and_(Job.status == 'running', Job.locked_until < now),
+        ),
+    )
+
+
+def claim(worker_id, visibility_timeout=None):
+    """Atomically claim the next runnable job, or return None."""
+    visibility_timeout = visibility_timeout or current_app.config['JOB_VISIBILITY_TIMEOUT']
+    now = datetime.utcnow()
+    candidates = db.session.execute(
+        select(Job.id).where(_claimable(now)).order_by(Job.run_after, Job.id).limit(10)
+    ).scalars().all()
+    for job_id in candidates:
+        # The guarded UPDATE makes sure only one worker wins each job
+        res = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, _claimable(now))
+            .values(status='running', locked_by=worker_id, attempts=Job.attempts + 1,
+                    locked_until=now + timedelta(seconds=visibility_timeout), updated_at=now)
+        )
+        db.session.commit()
+        if res.rowcount == 1:
+            return db.session.get(Job, job_id)
+    return None
+
+
+def reap_expired():
+    """Mark running jobs that timed out on their final attempt as failed."""
+    now = datetime.utcnow()
+    db.session.execute(
+        update(Job)
+        .where(Job.status == 'running', Job.locked_until < now, Job.attempts >= Job.max_attempts)
+        .values(status='failed', last_error='visibility timeout expired', updated_at=now)
+    )
+    db.session.commit()
+
+
+def run_job(job):
+    """Run a claimed job and record the outcome."""
+    fn = _handlers.get(job.kind)
+    try:
+        if fn is None:
+            raise LookupError(f'no handler registered for {job.kind}')
+        fn(**job.get_payload())
+    except Exception:
+        db.session.rollback()
+        job = db.session.get(Job, job.id)
+        job.last_error = traceback.format_exc(limit=5)
+        job.locked_until = None
+        if job.attempts >= job.max_attempts:
+            job.status = 'failed'
+        else:
+            job.status = 'queued'
+            job.run_after = datetime.utcnow() + timedelta(seconds=2 ** job.attempts)
+        db.session.commit()
+        current_app.logger.exception('Job %s (%s) failed on attempt %s', job.id, job.kind, job.attempts)
+        return False
+    job.status = 'done'
+    job.locked_until = None
+    job.last_error = None
+    db.session.commit()
+    return True
+
+
+def queue_counts():
+    rows = db.session.execute(select(Job.status, func.count(Job.id)).group_by(Job.status))
+    return {status: count for status, count in rows}
+
+
+def _work_loop(app, worker_id, poll_interval, stop, once):
+    with app.app_context():
+        while not stop.is_set():
+            try:
+                job = claim(worker_id)
+                if job is None:
+                    if once:
+                        return
+                    reap_expired()
+                    stop.wait(poll_interval)
+                    continue
+                run_job(job)
+            except Exception:
+                app.logger.exception('Job worker %s error', worker_id)
+                db.session.rollback()
+                stop.wait(poll_interval)
+            finally:
+                db.session.remove()
+
+
+def run_worker(app, concurrency=2, poll_interval=1.0, once=False):
+    """Process jobs with `concurrency` threads until interrupted (or the queue drains if `once`)."""
+    stop = threading.Event()
+    base_id = f'{socket.gethostname()}:{os.getpid()}'
+    threads = [
+        threading.Thread(target=_work_loop, args=(app, f'{base_id}:{i}', poll_interval, stop, once), daemon=True)
+        for i in range(concurrency)
+    ]
+    for t in threads:
+        t.start()
+    try:
+        while any(t.is_alive() for t in threads):
+            time.sleep(0.2)
+    except KeyboardInterrupt:
+        stop.set()
+        for t in threads:
+            t.join()
@@ -3,8 +3,10 @@ from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 import json
 from datetime import datetime
+from app.replica import RoutingSession
 
-db = SQLAlchemy()
+# RoutingSession sends reads from @read_replica views to the optional replica bind
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 
 class AuditLog(db.Model):
@@ -32,6 +34,12 @@ class User(UserMixin, db.Model):
     share_token = db.Column(db.String(64), unique=True, nullable=True)
     # Admin flag for admin dashboard access
     is_admin = db.Column(db.Boolean, default=False)
+    # Cleared when the account is scheduled for deletion (overrides UserMixin.is_active)
+    is_active = db.Column(db.Boolean, default=True)
+    # Signup time (NULL for accounts created before this column existed)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=True)
+    # Bumped on every change to the user's workouts/routines/badges; see app/sync.py
+    sync_version = db.Column(db.Integer, default=0, nullable=False)
 
     workouts = db.relationship('Workout', backref='user', lazy=True, cascade='all, delete-orphan')
     routines = db.relationship('Routine', backref='user', lazy=True, cascade='all, delete-orphan')
@@ -44,18 +52,28 @@ class User(UserMixin, db.Model):
         return check_password_hash(self.password_hash, password)
 
 class Workout(db.Model):
+    # One check-in per user per day; check-ins rely on it for INSERT ... ON CONFLICT DO NOTHING
+    __table_args__ = (
+        db.Index('uq_workout_user_date', 'user_id', 'date', unique=True),
+        db.Index('ix_workout_user_version', 'user_id', 'version'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     date = db.Column(db.String(10), nullable=False)
     notes = db.Column(db.String(255))
+    version = db.Column(db.Integer, default=0, nullable=False)
 
 class Routine(db.Model):
+    __table_args__ = (db.Index('ix_routine_user_version', 'user_id', 'version'),)
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     day = db.Column(db.Integer, nullable=False)
     name = db.Column(db.String(120))
     muscle_groups = db.Column(db.String(500))  # Store as JSON string
     is_rest_day = db.Column(db.Boolean, default=False)
+    version = db.Column(db.Integer, default=0, nullable=False)
 
     def get_muscle_groups(self):
         if self.muscle_groups:
@@ -66,7 +84,42 @@ class Routine(db.Model):
         self.muscle_groups = json.dumps(groups)
 
 
+# Per-user, per-year bitmap of workout days (bit N = day-of-year N+1, little-endian bytes).
+# Kept in sync with Workout on check-in/delete; see app/bitmaps.py.
+class WorkoutBitmap(db.Model):
+    __table_args__ = (db.UniqueConstraint('user_id', 'year', name='uq_workout_bitmap_user_year'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    year = db.Column(db.Integer, nullable=False)
+    bits = db.Column(db.LargeBinary(46), nullable=False)
+
+
+# Per-user workout counts per ISO week (keyed by the Monday) and per calendar month.
+# Updated incrementally on check-in/delete; see app/rollups.py.
+class WeeklyWorkoutCount(db.Model):
+    __table_args__ = (db.UniqueConstraint('user_id', 'week_start', name='uq_weekly_count_user_week'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    week_start = db.Column(db.String(10), nullable=False)  # YYYY-MM-DD (Monday)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class MonthlyWorkoutCount(db.Model):
+    __table_args__ = (db.UniqueConstraint('user_id', 'month', name='uq_monthly_count_user_month'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    month = db.Column(db.String(7), nullable=False)  # YYYY-MM
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
 # Badges
+# Milestone badges (keys seeded by seed_badges) earned at these streak lengths
+MILESTONE_BADGES = {7: 'streak_7', 30: 'streak_30', 100: 'streak_100'}
+
+
 class Badge(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     key = db.Column(db.String(64), unique=True, nullable=False)
@@ -84,10 +137,16 @@ class Badge(db.Model):
         }
 
 class UserBadge(db.Model):
+    __table_args__ = (
+        db.Index('uq_user_badge_user_badge', 'user_id', 'badge_id', unique=True),
+        db.Index('ix_user_badge_user_version', 'user_id', 'version'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     badge_id = db.Column(db.Integer, db.ForeignKey('badge.id'), nullable=False)
     awarded_at = db.Column(db.DateTime, nullable=False)
+    version = db.Column(db.Integer, default=0, nullable=False)
 
     badge = db.relationship('Badge')
 
@@ -97,3 +156,45 @@ class UserBadge(db.Model):
             'badge': self.badge.to_dict(),
             'awarded_at': self.awarded_at.strftime('%Y-%m-%d %H:%M:%S')
         }
+
+
+# Background jobs (see app/jobs.py)
+class Job(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(64), nullable=False)
+    payload = db.Column(db.Text, nullable=False, default='{}')  # JSON-encoded kwargs
+    status = db.Column(db.String(16), nullable=False, default='queued', index=True)  # queued/running/done/failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    locked_until = db.Column(db.DateTime, nullable=True)
+    locked_by = db.Column(db.String(64), nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def get_payload(self):
+        return json.loads(self.payload) if self.payload else {}
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'last_error': self.last_error,
+            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S') if self.created_at else None
+        }
+
+
+# Records deletions for /api/sync so clients can drop rows removed since their cursor.
+# kind is 'workout' (key = date), 'routine' (key = day) or 'badge' (key = badge key).
+class SyncTombstone(db.Model):
+    __table_args__ = (db.Index('ix_sync_tombstone_user_version', 'user_id', 'version'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    kind = db.Column(db.String(16), nullable=False)
+    key = db.Column(db.String(64), nullable=False)
+    version = db.Column(db.Integer, nullable=False)
@@ -0,0 +1,227 @@
+"""Opt-in per-request profiling.
+
+A request is run under cProfile when any of these triggers fires:
+
+- PROFILE_SAMPLE_RATE: a random fraction of all requests (e.g. 0.01).
+- PROFILE_HEADER: an admin sends this header with the value 1 (e.g. `X-Profile: 1`).
+- PROFILE_ENDPOINTS: always profile these endpoint names or paths ('*' for everything).
+
+Each profile is written to instance_path/profiles as a `.prof` file (load it with pstats or
+snakeviz) plus a `.json` summary with the slowest functions and the SQL statements the
+request ran with their timings. Only the newest PROFILE_MAX_FILES profiles are kept.
+
+When no trigger is configured no hooks or SQL listeners are registered at all, and cProfile/
+pstats are only imported once they are needed.
+"""
+import io
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from flask import g, has_request_context, request
+from flask_login import current_user
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+TOP_FUNCTIONS = 30
+TOP_STATEMENTS = 20
+
+_ring_lock = threading.Lock()
+PROFILE_ID = re.compile(r'[0-9T]+-[0-9a-f]{6}')
+
+
+def profile_dir(app):
+    return os.path.join(app.instance_path, 'profiles')
+
+
+def _endpoints(value):
+    if isinstance(value, str):
+        value = value.split(',')
+    return {v.strip() for v in value or () if v.strip()}
+
+
+def is_enabled(app):
+    cfg = app.config
+    return bool(cfg['PROFILE_SAMPLE_RATE'] > 0 or cfg['PROFILE_HEADER'] or cfg['PROFILE_ENDPOINTS'])
+
+
+def _trigger(app):
+    """Name of the trigger that selects this request for profiling, or None."""
+    cfg = app.config
+    endpoints = _endpoints(cfg['PROFILE_ENDPOINTS'])
+    if '*' in endpoints or request.endpoint in endpoints or request.path in endpoints:
+        return 'config'
+    header = cfg['PROFILE_HEADER']
+    if header and request.headers.get(header) == '1':
+        # Only admins may ask for a profile, so the header can't be used to slow the site down
+        if current_user.is_authenticated and current_user.is_admin:
+            return 'header'
+    rate = cfg['PROFILE_SAMPLE_RATE']
+    if rate > 0 and random.random() < rate:
+        return 'sample'
+    return None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and g.get('_profile'):
+        conn.info.setdefault('_profile_query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and g.get('_profile') and conn.info.get('_profile_query_start'):
+        elapsed = time.perf_counter() - conn.info['_profile_query_start'].pop()
+        g._profile['sql'].append((statement, elapsed))
+
+
+def _summary(profiler):
+    import pstats
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, name), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            'function': f'{os.path.basename(filename)}:{line}({name})',
+            'calls': calls,
+            'tottime_ms': round(tottime * 1000, 3),
+            'cumtime_ms': round(cumtime * 1000, 3),
+        })
+    rows.sort(key=lambda r: r['cumtime_ms'], reverse=True)
+    return rows[:TOP_FUNCTIONS]
+
+
+def save_profile(app, state, status_code):
+    """Write the .prof/.json pair for a finished request and trim the ring."""
+    directory = profile_dir(app)
+    os.makedirs(directory, exist_ok=True)
+    profile_id = state['id']
+    sql = sorted(state['sql'], key=lambda s: s[1], reverse=True)
+    meta = {
+        'id': profile_id,
+        'started_at': state['started_at'],
+        'method': state['method'],
+        'path': state['path'],
+        'endpoint': state['endpoint'],
+        'trigger': state['trigger'],
+        'user_id': state['user_id'],
+        'status': status_code,
+        'duration_ms': round(state['duration'] * 1000, 3),
+        'sql': {
+            'count': len(sql),
+            'total_ms': round(sum(t for _, t in sql) * 1000, 3),
+            'slowest': [{'statement': s, 'ms': round(t * 1000, 3)} for s, t in sql[:TOP_STATEMENTS]],
+        },
+        'functions': _summary(state['profiler']),
+    }
+    state['profiler'].dump_stats(os.path.join(directory, f'{profile_id}.prof'))
+    with open(os.path.join(directory, f'{profile_id}.json'), 'w') as f:
+        json.dump(meta, f)
+    _trim(directory, app.config['PROFILE_MAX_FILES'])
+    return meta
+
+
+def _trim(directory, keep):
+    with _ring_lock:
+        ids = sorted(name[:-5] for name in os.listdir(directory) if name.endswith('.json'))
+        for profile_id in ids[:max(0, len(ids) - keep)]:
+            for ext in ('.json', '.prof'):
+                try:
+                    os.remove(os.path.join(directory, profile_id + ext))
+                except FileNotFoundError:
+                    pass  # another worker trimmed it first
+
+
+def list_profiles(app):
+    """Profile summaries (without the function table), newest first."""
+    directory = profile_dir(app)
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            continue
+        meta.pop('functions', None)
+        meta['sql'].pop('slowest', None)
+        profiles.append(meta)
+    return profiles
+
+
+def load_profile(app, profile_id):
+    """Full summary plus the pstats text report, or None if it has been rotated out."""
+    path = os.path.join(profile_dir(app), f'{profile_id}.json')
+    if not PROFILE_ID.fullmatch(profile_id) or not os.path.exists(path):
+        return None
+    import pstats
+    with open(path) as f:
+        meta = json.load(f)
+    out = io.StringIO()
+    pstats.Stats(os.path.join(profile_dir(app), f'{profile_id}.prof'), stream=out) \
+        .sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+    meta['report'] = out.getvalue()
+    return meta
+
+
+def init_profiler(app):
+    app.config.setdefault('PROFILE_SAMPLE_RATE', 0.0)
+    app.config.setdefault('PROFILE_HEADER', None)
+    app.config.setdefault('PROFILE_ENDPOINTS', ())
+    app.config.setdefault('PROFILE_MAX_FILES', 50)
+    if not is_enabled(app):
+        return app
+
+    import cProfile
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def start_profile():
+        trigger = _trigger(app)
+        if trigger is None:
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            return  # another profiler is already active in this thread
+        g._profile = {
+            'id': f'{datetime.utcnow():%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:6]}',
+            'profiler': profiler,
+            'trigger': trigger,
+            'started_at': datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'),
+            'start': time.perf_counter(),
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'user_id': current_user.get_id() if current_user.is_authenticated else None,
+            'sql': [],
+        }
+
+    @app.after_request
+    def tag_profile(response):
+        state = g.get('_profile')
+        if state:
+            response.headers['X-Profile-Id'] = state['id']
+            state['status'] = response.status_code
+        return response
+
+    @app.teardown_request
+    def finish_profile(exc):
+        state = g.pop('_profile', None)
+        if not state:
+            return
+        state['profiler'].disable()
+        state['duration'] = time.perf_counter() - state['start']
+        try:
+            save_profile(app, state, state.get('status', 500))
+        except OSError:
+            app.logger.exception('Failed to save request profile')
+
+    return app
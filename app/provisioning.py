@@ -0,0 +1,137 @@
+"""Bulk user provisioning used to onboard a whole gym from a CSV of members."""
+import csv
+import io
+import os
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import insert, or_, select
+from werkzeug.security import generate_password_hash
+
+from app.models import db, User, Routine
+
+
+def read_members_csv(stream):
+    """Parse a members CSV (columns: username, email, optional password).
+
+    Returns (members, errors) where errors holds (line_number, message) tuples for rows
+    that could not be used.
+    """
+    if isinstance(stream, (bytes, bytearray)):
+        stream = stream.decode('utf-8-sig')
+    if isinstance(stream, str):
+        stream = io.StringIO(stream)
+    reader = csv.DictReader(stream)
+    members, errors = [], []
+    for line_no, row in enumerate(reader, start=2):
+        row = {(k or '').strip().lower(): (v or '').strip() for k, v in row.items()}
+        username = row.get('username', '')
+        email = row.get('email', '')
+        if not username or not email:
+            errors.append((line_no, 'username and email are required'))
+            continue
+        if len(username) > 80 or len(email) > 120:
+            errors.append((line_no, 'username or email too long'))
+            continue
+        members.append({'username': username, 'email': email, 'password': row.get('password', '')})
+    return members, errors
+
+
+def _hash_chunk(passwords):
+    return [generate_password_hash(p) for p in passwords]
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def hash_passwords(passwords, workers=None, pool=None):
+    """Hash `passwords` in order, spreading the work over a process pool when there are several.
+
+    Pass an open ProcessPoolExecutor as `pool` to reuse it across calls; otherwise one is
+    started for this call.
+    """
+    workers = min(workers or os.cpu_count() or 1, len(passwords))
+    if workers <= 1:
+        return _hash_chunk(passwords)
+    size = -(-len(passwords) // workers)
+    if pool is not None:
+        return [h for chunk in pool.map(_hash_chunk, _chunks(passwords, size)) for h in chunk]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [h for chunk in pool.map(_hash_chunk, _chunks(passwords, size)) for h in chunk]
+
+
+def _existing_accounts(members, batch_size):
+    """Return the usernames and emails among `members` that are already registered."""
+    usernames, emails = set(), set()
+    for batch in _chunks(members, batch_size):
+        names = [m['username'] for m in batch]
+        mails = [m['email'] for m in batch]
+        rows = db.session.execute(
+            select(User.username, User.email).where(or_(User.username.in_(names), User.email.in_(mails)))
+        )
+        for username, email in rows:
+            usernames.add(username)
+            emails.add(email)
+    return usernames, emails
+
+
+def provision_users(members, batch_size=500, workers=None, progress=None):
+    """Create users (and their default routines) for `members` in bulk.
+
+    Members whose username or email already exists are skipped, so re-running the same
+    CSV is safe. Passwords are hashed across a process pool; members without a password
+    get a temporary one which is returned in `temp_passwords`.
+    """
+    result = {'created': 0, 'skipped': [], 'temp_passwords': {}}
+    usernames, emails = _existing_accounts(members, batch_size)
+
+    pending = []
+    for m in members:
+        if m['username'] in usernames or m['email'] in emails:
+            result['skipped'].append(m['username'])
+            continue
+        # Also guard against duplicates inside the CSV itself
+        usernames.add(m['username'])
+        emails.add(m['email'])
+        if not m.get('password'):
+            m = dict(m, password=secrets.token_urlsafe(8))
+            result['temp_passwords'][m['username']] = m['password']
+        pending.append(m)
+
+    total = len(pending)
+    if progress:
+        progress(0, total)
+    if not total:
+        return result
+
+    # One pool for the whole run; hash_passwords() splits each batch across it
+    workers = workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for batch in _chunks(pending, batch_size):
+            hashes = hash_passwords([m['password'] for m in batch], workers, pool)
+            db.session.execute(insert(User), [
+                {'username': m['username'], 'email': m['email'], 'password_hash': h}
+                for m, h in zip(batch, hashes)
+            ])
+            ids = db.session.execute(
+                select(User.id).where(User.username.in_([m['username'] for m in batch]))
+            ).scalars().all()
+            db.session.execute(insert(Routine), [
+                {'user_id': user_id, 'day': day, 'name': '', 'is_rest_day': False}
+                for user_id in ids for day in range(7)
+            ])
+            db.session.commit()
+
+            result['created'] += len(batch)
+            if progress:
+                progress(result['created'], total)
+    except Exception:
+        db.session.rollback()
+        raise
+    finally:
+        if pool:
+            pool.shutdown()
+    return result
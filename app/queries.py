@@ -0,0 +1,189 @@
+"""Read-side queries that skip the ORM.
+
+Read handlers only need a few columns. Loading full `Workout`/`Routine`/`UserBadge`
+entities also puts every row through the identity map and change tracking. The functions
+here select just the columns they need with Core statements. They return small slotted
+dataclasses: no per-instance `__dict__`, no session state, and nothing to flush. Writes
+still go through the models.
+
+Every function accepts `since` where it matters, so /api/sync can reuse them for its
+version-filtered deltas.
+"""
+import json
+from dataclasses import dataclass
+from itertools import groupby
+
+from sqlalchemy import func, select
+
+from app import bitmaps
+from app.models import db, AuditLog, Badge, Routine, User, UserBadge, Workout, WorkoutBitmap
+
+TIMESTAMP = '%Y-%m-%d %H:%M:%S'
+
+
+@dataclass(slots=True)
+class WorkoutRow:
+    date: str
+    notes: str | None
+
+    def to_dict(self):
+        return {'date': self.date, 'notes': self.notes}
+
+
+@dataclass(slots=True)
+class RoutineRow:
+    day: int
+    name: str | None
+    muscle_groups: str | None
+    is_rest_day: bool | None
+
+    def to_dict(self):
+        return {
+            'day': self.day,
+            'name': self.name or '',
+            'muscle_groups': json.loads(self.muscle_groups) if self.muscle_groups else [],
+            'is_rest_day': self.is_rest_day,
+        }
+
+
+@dataclass(slots=True)
+class BadgeRow:
+    id: int
+    key: str
+    name: str
+    description: str | None
+    icon: str | None
+
+    def to_dict(self):
+        return {'id': self.id, 'key': self.key, 'name': self.name, 'description': self.description, 'icon': self.icon}
+
+
+@dataclass(slots=True)
+class AwardedBadgeRow:
+    id: int
+    awarded_at: object  # datetime
+    badge: BadgeRow
+
+    def to_dict(self):
+        return {'id': self.id, 'badge': self.badge.to_dict(), 'awarded_at': self.awarded_at.strftime(TIMESTAMP)}
+
+
+@dataclass(slots=True)
+class AuditLogRow:
+    id: int
+    actor_id: int | None
+    action: str
+    details: str | None
+    created_at: object  # datetime
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'actor_id': self.actor_id,
+            'action': self.action,
+            'details': self.details,
+            'created_at': self.created_at.strftime(TIMESTAMP),
+        }
+
+
+@dataclass(slots=True)
+class AdminUserRow:
+    id: int
+    username: str
+    email: str
+    is_admin: bool
+    workouts: int
+    last_workout: str | None
+    current_streak: int = 0
+    best_streak: int = 0
+
+
+@dataclass(slots=True)
+class SharedUser:
+    id: int
+    username: str
+
+
+BADGE_COLUMNS = (Badge.id, Badge.key, Badge.name, Badge.description, Badge.icon)
+
+
+def workouts(user_id, since=None):
+    stmt = select(Workout.date, Workout.notes).where(Workout.user_id == user_id)
+    if since is not None:
+        stmt = stmt.where(Workout.version > since)
+    # The (user_id, date) unique index serves both the filter and the order
+    return [WorkoutRow(date, notes) for date, notes in db.session.execute(stmt.order_by(Workout.date))]
+
+
+def routines(user_id, since=None):
+    stmt = (
+        select(Routine.day, Routine.name, Routine.muscle_groups, Routine.is_rest_day)
+        .where(Routine.user_id == user_id)
+    )
+    if since is not None:
+        stmt = stmt.where(Routine.version > since)
+    return [RoutineRow(*row) for row in db.session.execute(stmt.order_by(Routine.day))]
+
+
+def badges():
+    return [BadgeRow(*row) for row in db.session.execute(select(*BADGE_COLUMNS).order_by(Badge.id))]
+
+
+def awarded_badges(user_id, since=None):
+    stmt = (
+        select(UserBadge.id, UserBadge.awarded_at, *BADGE_COLUMNS)
+        .join(Badge, Badge.id == UserBadge.badge_id)
+        .where(UserBadge.user_id == user_id)
+    )
+    if since is not None:
+        stmt = stmt.where(UserBadge.version > since)
+    return [AwardedBadgeRow(row[0], row[1], BadgeRow(*row[2:])) for row in db.session.execute(stmt)]
+
+
+def audit_logs(limit):
+    stmt = (
+        select(AuditLog.id, AuditLog.actor_id, AuditLog.action, AuditLog.details, AuditLog.created_at)
+        .order_by(AuditLog.created_at.desc())
+        .limit(limit)
+    )
+    return [AuditLogRow(*row) for row in db.session.execute(stmt)]
+
+
+def shared_user(token):
+    row = db.session.execute(select(User.id, User.username).where(User.share_token == token)).first()
+    return SharedUser(*row) if row else None
+
+
+def admin_users():
+    """Every user with workout count, last workout and streaks, in three queries."""
+    counts = (
+        select(Workout.user_id, func.count().label('workouts'), func.max(Workout.date).label('last_workout'))
+        .group_by(Workout.user_id)
+        .subquery()
+    )
+    stmt = (
+        select(
+            User.id, User.username, User.email, User.is_admin,
+            func.coalesce(counts.c.workouts, 0), counts.c.last_workout,
+        )
+        .outerjoin(counts, counts.c.user_id == User.id)
+        .order_by(User.username)
+    )
+    users = [AdminUserRow(*row) for row in db.session.execute(stmt)]
+
+    stored = db.session.execute(
+        select(WorkoutBitmap.user_id, WorkoutBitmap.year, WorkoutBitmap.bits).order_by(WorkoutBitmap.user_id)
+    )
+    years_by_user = {
+        user_id: {year: bitmaps.from_bytes(bits) for _, year, bits in rows}
+        for user_id, rows in groupby(stored, key=lambda row: row[0])
+    }
+    for user in users:
+        if not user.workouts:
+            continue
+        # Users whose bitmaps haven't been stored yet get them computed from their rows
+        years = years_by_user.get(user.id)
+        if years is None:
+            years = bitmaps.load_user_bitmaps(user.id)
+        user.current_streak, user.best_streak = bitmaps.streaks(years)
+    return users
@@ -0,0 +1,191 @@
+"""In-process rate limiting and load shedding.
+
+Each limited endpoint gets a token-bucket rule ("<requests>/<seconds>") applied per client
+IP and, where it makes sense, per path token (e.g. the share token). Bucket state lives in
+a memory-bounded LRU by default; set RATELIMIT_STORAGE_URL=redis://... (needs the
+optional `redis` package) to share buckets between processes.
+
+Independently of the buckets, every limited endpoint has a cap on requests in flight;
+past it new requests are shed with 503 straight away instead of queueing behind
+expensive password hashes or full-history scans.
+"""
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, jsonify, render_template, request
+
+try:
+    import redis
+except ImportError:  # optional dependency
+    redis = None
+
+
+def parse_rule(rule):
+    """'10/60' -> (capacity=10, refill_per_second=10/60)."""
+    count, _, seconds = str(rule).partition('/')
+    count, seconds = int(count), float(seconds or 1)
+    return count, count / seconds
+
+
+def client_ip():
+    # Each trusted proxy appends the address it saw, so with N of them the client is the Nth
+    # X-Forwarded-For entry from the right; anything left of that is whatever the client sent.
+    # Like werkzeug's ProxyFix, a header shorter than that didn't come through the proxies.
+    trusted = current_app.config.get('RATELIMIT_TRUSTED_PROXIES', 0)
+    forwarded = request.access_route if 'X-Forwarded-For' in request.headers else []
+    if trusted and len(forwarded) >= trusted:
+        return forwarded[-trusted]
+    return request.remote_addr
+
+
+class MemoryStore:
+    """Token buckets in an LRU capped at `max_keys` entries."""
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def take(self, key, capacity, rate, now=None):
+        """Take one token; returns (allowed, seconds until a token is available)."""
+        now = now or time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+                self.evictions += 1
+        return allowed, 0 if allowed else (1 - tokens) / rate
+
+    def size(self):
+        return len(self._buckets)
+
+
+class RedisStore:
+    """Token buckets shared through Redis (atomic via a Lua script)."""
+
+    SCRIPT = """
+    local capacity, rate, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local tokens = tonumber(state[1]) or capacity
+    local updated = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + (now - updated) * rate)
+    local allowed = 0
+    if tokens >= 1 then tokens = tokens - 1; allowed = 1 end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, url):
+        self._client = redis.Redis.from_url(url)
+        self._take = self._client.register_script(self.SCRIPT)
+
+    def take(self, key, capacity, rate, now=None):
+        allowed, tokens = self._take(keys=[f'ratelimit:{key}'], args=[capacity, rate, now or time.time()])
+        return bool(allowed), 0 if allowed else (1 - float(tokens)) / rate
+
+    def size(self):
+        return None
+
+
+class Limiter:
+    def __init__(self, app=None):
+        self.store = None
+        self.counters = {}
+        self._slots = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('RATELIMIT_ENABLED', True)
+        app.config.setdefault('RATELIMIT_TRUSTED_PROXIES', 0)
+        app.config.setdefault('RATELIMIT_MAX_KEYS', 10000)
+        app.config.setdefault('RATELIMIT_STORAGE_URL', None)
+        app.config.setdefault('RATELIMIT_RULES', {})
+        app.config.setdefault('RATELIMIT_CONCURRENCY', {})
+        url = app.config['RATELIMIT_STORAGE_URL']
+        if url and redis is not None:
+            self.store = RedisStore(url)
+        else:
+            if url:
+                app.logger.warning('RATELIMIT_STORAGE_URL set but `redis` is not installed; using in-memory buckets')
+            self.store = MemoryStore(app.config['RATELIMIT_MAX_KEYS'])
+        app.extensions['limiter'] = self
+
+    def _count(self, name, outcome):
+        with self._lock:
+            counts = self.counters.setdefault(name, {'allowed': 0, 'limited': 0, 'shed': 0})
+            counts[outcome] += 1
+
+    def _slot(self, name):
+        with self._lock:
+            if name not in self._slots:
+                cap = current_app.config['RATELIMIT_CONCURRENCY'].get(name)
+                self._slots[name] = threading.BoundedSemaphore(cap) if cap else None
+            return self._slots[name]
+
+    def _reject(self, status, retry_after, template, message):
+        if template:
+            resp = current_app.make_response((render_template(template, error=message), status))
+        else:
+            resp = jsonify({'error': message})
+            resp.status_code = status
+        resp.headers['Retry-After'] = str(max(1, int(retry_after + 0.999)))
+        return resp
+
+    def limit(self, name, keys=('ip',), methods=None, template=None):
+        """Apply the RATELIMIT_RULES[name] bucket and RATELIMIT_CONCURRENCY[name] cap.
+
+        `keys` are 'ip' and/or names of view arguments (e.g. 'token'); each gets its own
+        bucket. Only `methods` are limited (all methods when None).
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                cfg = current_app.config
+                if not cfg['RATELIMIT_ENABLED'] or (methods and request.method not in methods):
+                    return view(*args, **kwargs)
+
+                rule = cfg['RATELIMIT_RULES'].get(name)
+                if rule:
+                    capacity, rate = parse_rule(rule)
+                    for key in keys:
+                        value = client_ip() if key == 'ip' else kwargs.get(key)
+                        allowed, retry_after = self.store.take(f'{name}:{key}:{value}', capacity, rate)
+                        if not allowed:
+                            self._count(name, 'limited')
+                            return self._reject(429, retry_after, template, 'Too many requests. Please try again shortly.')
+
+                slot = self._slot(name)
+                if slot is not None and not slot.acquire(blocking=False):
+                    self._count(name, 'shed')
+                    return self._reject(503, 1, template, 'Server is busy. Please try again shortly.')
+                self._count(name, 'allowed')
+                try:
+                    return view(*args, **kwargs)
+                finally:
+                    if slot is not None:
+                        slot.release()
+            return wrapper
+        return decorator
+
+    def stats(self):
+        with self._lock:
+            counters = {name: dict(c) for name, c in self.counters.items()}
+        return {
+            'backend': type(self.store).__name__,
+            'buckets': self.store.size(),
+            'evictions': getattr(self.store, 'evictions', None),
+            'rules': current_app.config['RATELIMIT_RULES'],
+            'concurrency': current_app.config['RATELIMIT_CONCURRENCY'],
+            'counters': counters,
+        }
@@ -0,0 +1,285 @@
+"""Full recompute of derived per-user data, sharded across a process pool.
+
+Bitmaps, weekly/monthly rollups and milestone badges are all derived from Workout rows.
+`recompute_all()` splits the user ids into contiguous ranges and hands them to worker
+processes; each worker opens its own engine, streams the range's workouts in bulk,
+diffs the expected rows against what is stored and writes only the differences back
+with batched upserts. Each batch first locks its users the way a check-in does, so
+check-ins landing mid-run are never overwritten with stale values. Finished shards are recorded in a JSON checkpoint so an
+interrupted run can be resumed; with `dry_run=True` nothing is written and the
+per-user differences are returned instead.
+"""
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from itertools import groupby
+
+from sqlalchemy import create_engine, delete, insert, select, tuple_, update
+
+from app import bitmaps, rollups
+from app.models import (
+    db, Badge, User, UserBadge, Workout, WorkoutBitmap, WeeklyWorkoutCount, MonthlyWorkoutCount, MILESTONE_BADGES,
+)
+from app.sync import next_versions
+from app.upsert import dialect_insert, supports_upsert
+
+# (table, key column, value column) for the keyed per-user tables
+DERIVED_TABLES = {
+    'bitmaps': (WorkoutBitmap.__table__, 'year', 'bits'),
+    'weeks': (WeeklyWorkoutCount.__table__, 'week_start', 'count'),
+    'months': (MonthlyWorkoutCount.__table__, 'month', 'count'),
+}
+
+_engine = None
+_badge_ids = None
+
+
+def plan_shards(shard_size):
+    """Split all user ids into [lo, hi] ranges of at most `shard_size` users."""
+    ids = db.session.execute(select(User.id).order_by(User.id)).scalars().all()
+    return [[ids[i], ids[min(i + shard_size, len(ids)) - 1]] for i in range(0, len(ids), shard_size)]
+
+
+def worker_database_url(engine, engine_options):
+    """The URL workers should connect with: the app engine's resolved URL (e.g. a relative
+    SQLite path already joined to the instance folder), with `sslmode` put back when the
+    app connects over SSL so `normalize_database_url()` rebuilds the SSL context."""
+    url = engine.url
+    if (engine_options.get('connect_args') or {}).get('ssl_context'):
+        url = url.update_query_dict({'sslmode': 'require'})
+    return url.render_as_string(hide_password=False)
+
+
+def _init_worker(database_url):
+    """Give this process its own engine; connections can't be shared across processes."""
+    global _engine, _badge_ids
+    # Engine options (e.g. an SSL context) don't pickle, so rebuild them from the URL
+    from app.config import normalize_database_url
+    url, engine_options = normalize_database_url(database_url)
+    _engine = create_engine(url, **engine_options)
+    with _engine.connect() as conn:
+        rows = conn.execute(select(Badge.key, Badge.id).where(Badge.key.in_(MILESTONE_BADGES.values())))
+        _badge_ids = dict(rows.all())
+
+
+def expected_rows(dates):
+    """Derived rows for one user's workout dates: ({table: {key: value}}, earned badge keys)."""
+    years = bitmaps.bitmaps_from_dates(dates)
+    weeks, months = rollups.counts_from_dates(dates)
+    best = bitmaps.longest_run(years)
+    expected = {
+        'bitmaps': {year: bitmaps.to_bytes(bits) for year, bits in years.items()},
+        'weeks': dict(weeks),
+        'months': dict(months),
+    }
+    return expected, {key for days, key in MILESTONE_BADGES.items() if best >= days}
+
+
+def _stored_rows(conn, lo, hi):
+    stored = {name: {} for name in DERIVED_TABLES}
+    for name, (table, key, value) in DERIVED_TABLES.items():
+        rows = conn.execute(
+            select(table.c.user_id, table.c[key], table.c[value]).where(table.c.user_id.between(lo, hi))
+        )
+        for user_id, k, v in rows:
+            stored[name].setdefault(user_id, {})[k] = bytes(v) if name == 'bitmaps' else v
+    badges = {}
+    if _badge_ids:
+        rows = conn.execute(
+            select(UserBadge.user_id, UserBadge.badge_id)
+            .where(UserBadge.user_id.between(lo, hi), UserBadge.badge_id.in_(_badge_ids.values()))
+        )
+        for user_id, badge_id in rows:
+            badges.setdefault(user_id, set()).add(badge_id)
+    return stored, badges
+
+
+def _workout_dates(conn, lo, hi, batch_size):
+    """Stream (user_id, [dates]) for every user with workouts in [lo, hi]."""
+    result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(
+        select(Workout.user_id, Workout.date)
+        .where(Workout.user_id.between(lo, hi))
+        .order_by(Workout.user_id)
+    )
+    for user_id, rows in groupby(result, key=lambda r: r[0]):
+        yield user_id, [d for _, d in rows]
+
+
+def _upsert(conn, table, key, value, rows):
+    """INSERT ... ON CONFLICT (user_id, key) DO UPDATE, or delete + insert elsewhere."""
+    if not rows:
+        return
+    if supports_upsert(conn):
+        stmt = dialect_insert(table, conn)
+        stmt = stmt.on_conflict_do_update(index_elements=['user_id', key], set_={value: stmt.excluded[value]})
+        conn.execute(stmt, rows)
+    else:
+        _delete_keys(conn, table, key, [(r['user_id'], r[key]) for r in rows])
+        conn.execute(insert(table), rows)
+
+
+def _insert_ignore(conn, table, index_elements, rows):
+    """INSERT ... ON CONFLICT DO NOTHING, so rows written concurrently by the app are kept."""
+    if not rows:
+        return
+    if supports_upsert(conn):
+        conn.execute(dialect_insert(table, conn).on_conflict_do_nothing(index_elements=list(index_elements)), rows)
+    else:
+        conn.execute(insert(table), rows)
+
+
+def _lock_users(conn, lo, hi):
+    """Lock users [lo, hi] the way check-ins do (their next_versions() UPDATE): row locks on
+    PostgreSQL, the database write lock on SQLite. Held until the batch commits, so no
+    check-in for these users can commit between the batch's read and its write."""
+    table = User.__table__
+    conn.execute(update(table).where(table.c.id.between(lo, hi)).values(sync_version=table.c.sync_version))
+
+
+def _delete_keys(conn, table, key, pairs):
+    if pairs:
+        conn.execute(delete(table).where(tuple_(table.c.user_id, table.c[key]).in_(pairs)))
+
+
+def _describe(user_id, changes):
+    parts = []
+    for name, (upserts, deletes) in changes.items():
+        if name == 'badges':
+            if upserts:
+                parts.append('badges +' + ','.join(sorted(upserts)))
+        elif upserts or deletes:
+            parts.append(f'{name} ~{len(upserts)} -{len(deletes)}')
+    return f'user {user_id}: ' + '; '.join(parts)
+
+
+def recompute_shard(lo, hi, dry_run=False, batch_size=1000):
+    """Recompute users with ids in [lo, hi]; runs inside a worker process."""
+    summary = {'shard': [lo, hi], 'users': 0, 'changed_users': 0, 'diffs': [],
+               'rows': {name: 0 for name in [*DERIVED_TABLES, 'badges']}}
+    badge_ids = _badge_ids or {}
+    with _engine.connect() as conn:
+        user_ids = conn.execute(
+            select(User.id).where(User.id.between(lo, hi)).order_by(User.id)
+        ).scalars().all()
+        conn.commit()  # each batch reads under its own locks, in its own transaction
+        # Process the shard in sub-ranges so each read/write round trip stays bounded
+        for i in range(0, len(user_ids), batch_size):
+            batch_lo, batch_hi = user_ids[i], user_ids[min(i + batch_size, len(user_ids)) - 1]
+            if not dry_run:
+                _lock_users(conn, batch_lo, batch_hi)
+            dates = dict(_workout_dates(conn, batch_lo, batch_hi, batch_size * 50))
+            stored, owned = _stored_rows(conn, batch_lo, batch_hi)
+            writes = {name: ([], []) for name in DERIVED_TABLES}
+            new_badges = []
+
+            for user_id in user_ids[i:i + batch_size]:
+                expected, earned = expected_rows(dates.get(user_id, []))
+                changes = {}
+                for name, (table, key, value) in DERIVED_TABLES.items():
+                    have = stored[name].get(user_id, {})
+                    want = expected[name]
+                    upserts = [k for k, v in want.items() if have.get(k) != v]
+                    deletes = [k for k in have if k not in want]
+                    if upserts or deletes:
+                        changes[name] = (upserts, deletes)
+                        writes[name][0].extend({'user_id': user_id, key: k, value: want[k]} for k in upserts)
+                        writes[name][1].extend((user_id, k) for k in deletes)
+                # Milestone badges are only ever awarded here, never revoked (admins award by hand
+                # too, and check-ins may award the same badge while the shard runs)
+                missing = {key for key in earned if key in badge_ids
+                           and badge_ids[key] not in owned.get(user_id, set())}
+                if missing:
+                    changes['badges'] = (missing, [])
+                    new_badges.extend({'user_id': user_id, 'badge_id': badge_ids[key]} for key in missing)
+
+                summary['users'] += 1
+                if changes:
+                    summary['changed_users'] += 1
+                    if dry_run:
+                        summary['diffs'].append(_describe(user_id, changes))
+
+            for name, (upserts, deletes) in writes.items():
+                summary['rows'][name] += len(upserts) + len(deletes)
+            summary['rows']['badges'] += len(new_badges)
+            if dry_run:
+                continue
+            for name, (table, key, value) in DERIVED_TABLES.items():
+                upserts, deletes = writes[name]
+                _delete_keys(conn, table, key, deletes)
+                _upsert(conn, table, key, value, upserts)
+            if new_badges:
+                now = datetime.utcnow()
+                versions = next_versions(conn, {row['user_id'] for row in new_badges})
+                _insert_ignore(conn, UserBadge.__table__, ('user_id', 'badge_id'), [
+                    dict(row, awarded_at=now, version=versions[row['user_id']]) for row in new_badges
+                ])
+            conn.commit()
+    return summary
+
+
+def _run_inline(database_url, shards, dry_run, batch_size):
+    _init_worker(database_url)
+    for lo, hi in shards:
+        yield recompute_shard(lo, hi, dry_run, batch_size)
+
+
+def _run_pool(database_url, shards, dry_run, batch_size, workers):
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(database_url,)) as pool:
+        futures = [pool.submit(recompute_shard, lo, hi, dry_run, batch_size) for lo, hi in shards]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_checkpoint(path, checkpoint):
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp, path)
+
+
+def recompute_all(database_url, checkpoint_path, shard_size=5000, batch_size=1000, workers=None,
+                  dry_run=False, resume=False, progress=None):
+    """Recompute every user's derived data; returns totals over the shards processed.
+
+    `database_url` is the app's resolved SQLAlchemy URL (see `worker_database_url()`),
+    which each worker connects with. With `resume`, shards listed in the checkpoint are skipped; the shard
+    plan itself is stored in the checkpoint so ranges stay the same between attempts.
+    Dry runs neither read nor write the checkpoint.
+    """
+    checkpoint = load_checkpoint(checkpoint_path) if resume and not dry_run else None
+    if checkpoint is None:
+        checkpoint = {'shards': plan_shards(shard_size), 'done': []}
+    done = {tuple(s) for s in checkpoint['done']}
+    pending = [s for s in checkpoint['shards'] if tuple(s) not in done]
+
+    totals = {'shards': len(pending), 'skipped_shards': len(done), 'users': 0, 'changed_users': 0,
+              'rows': {name: 0 for name in [*DERIVED_TABLES, 'badges']}, 'diffs': []}
+    if not pending:
+        return totals
+
+    workers = min(workers or os.cpu_count() or 1, len(pending))
+    runner = (_run_pool(database_url, pending, dry_run, batch_size, workers) if workers > 1
+              else _run_inline(database_url, pending, dry_run, batch_size))
+    for finished, summary in enumerate(runner, start=1):
+        totals['users'] += summary['users']
+        totals['changed_users'] += summary['changed_users']
+        for name, count in summary['rows'].items():
+            totals['rows'][name] += count
+        totals['diffs'].extend(summary['diffs'])
+        if not dry_run:
+            checkpoint['done'].append(summary['shard'])
+            save_checkpoint(checkpoint_path, checkpoint)
+        if progress:
+            progress(finished, len(pending), summary)
+
+    if not dry_run:
+        os.remove(checkpoint_path)
+    return totals
@@ -0,0 +1,64 @@
+"""Read-replica routing.
+
+When DATABASE_READ_URL is set a second engine is configured as the `replica` bind.
+GET views decorated with `@read_replica` run their SELECTs against it, except for a few
+seconds (REPLICA_STICKY_SECONDS) after the same user's last write, so people always see
+their own check-ins. Flushes and INSERT/UPDATE/DELETE statements always go to the primary.
+
+To try it locally point DATABASE_URL and DATABASE_READ_URL at two SQLite files (copy the
+primary file to create the "replica") or at two local Postgres instances.
+"""
+import time
+from functools import wraps
+
+from flask import g, has_app_context, request, session
+from flask_sqlalchemy.session import Session
+
+REPLICA_BIND = 'replica'
+WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+
+class RoutingSession(Session):
+    """Session that sends reads to the replica engine when the current request allows it."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and not self._flushing and has_app_context() and g.get('use_replica')
+                and not getattr(clause, 'is_dml', False)):
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def read_replica(view):
+    """Mark a read-only view as safe to serve from the replica."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        return view(*args, **kwargs)
+    wrapper.use_replica = True
+    return wrapper
+
+
+def init_read_replica(app):
+    app.config.setdefault('REPLICA_STICKY_SECONDS', 5)
+    if REPLICA_BIND not in (app.config.get('SQLALCHEMY_BINDS') or {}):
+        return app
+
+    @app.before_request
+    def route_reads():
+        view = app.view_functions.get(request.endpoint)
+        if request.method != 'GET' or not getattr(view, 'use_replica', False):
+            return
+        last_write = session.get('_last_write_at')
+        # Read-your-writes: stay on the primary briefly after this user's own write
+        if last_write and time.time() - last_write < app.config['REPLICA_STICKY_SECONDS']:
+            return
+        g.use_replica = True
+
+    @app.after_request
+    def remember_writes(response):
+        if request.method in WRITE_METHODS and response.status_code < 400:
+            session['_last_write_at'] = time.time()
+        return response
+
+    return app
@@ -0,0 +1,117 @@
+"""Weekly and monthly workout-count rollups.
+
+`adjust()` keeps the per-user WeeklyWorkoutCount / MonthlyWorkoutCount rows up to date as
+workouts are added and removed, so long-range history reads a handful of rows instead of
+the full workout list. `rebuild_user()` / `flask rebuild-rollups` regenerate them in batch.
+"""
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import delete, select, update
+
+from app.models import db, Workout, WeeklyWorkoutCount, MonthlyWorkoutCount
+from app.upsert import increment, supports_upsert
+
+GRANULARITIES = {
+    'week': (WeeklyWorkoutCount, WeeklyWorkoutCount.week_start),
+    'month': (MonthlyWorkoutCount, MonthlyWorkoutCount.month),
+}
+
+
+def _parse(day):
+    return day if isinstance(day, date) else datetime.strptime(day, '%Y-%m-%d').date()
+
+
+def week_key(day):
+    return (day - timedelta(days=day.weekday())).strftime('%Y-%m-%d')
+
+
+def month_key(day):
+    return day.strftime('%Y-%m')
+
+
+def _has_rollups(user_id):
+    return db.session.execute(
+        select(MonthlyWorkoutCount.id).where(MonthlyWorkoutCount.user_id == user_id).limit(1)
+    ).first() is not None
+
+
+def adjust(user_id, workout_date, delta):
+    """Add `delta` to the week and month containing `workout_date` (caller commits)."""
+    if not _has_rollups(user_id):
+        # No rollups yet for this user: build them from the rows, which already include this change
+        rebuild_user(user_id)
+        return
+    day = _parse(workout_date)
+    for model, column, key in (
+        (WeeklyWorkoutCount, WeeklyWorkoutCount.week_start, week_key(day)),
+        (MonthlyWorkoutCount, MonthlyWorkoutCount.month, month_key(day)),
+    ):
+        if delta > 0 and supports_upsert():
+            # Single statement, and no duplicate-key race when two requests open the same week
+            increment(model, {'user_id': user_id, column.key: key}, ('user_id', column.key), 'count', delta)
+            continue
+        res = db.session.execute(
+            update(model).where(model.user_id == user_id, column == key).values(count=model.count + delta)
+        )
+        if res.rowcount == 0 and delta > 0:
+            db.session.add(model(user_id=user_id, count=delta, **{column.key: key}))
+
+
+def counts_from_dates(workout_dates):
+    """({week_start: count}, {month: count}) over the distinct workout days."""
+    days = {_parse(d) for d in workout_dates}
+    return Counter(week_key(d) for d in days), Counter(month_key(d) for d in days)
+
+
+def rebuild_user(user_id):
+    """Regenerate a user's rollups from Workout rows (caller commits)."""
+    dates = db.session.execute(select(Workout.date).where(Workout.user_id == user_id)).scalars().all()
+    weeks, months = counts_from_dates(dates)
+    delete_user(user_id)
+    db.session.add_all([WeeklyWorkoutCount(user_id=user_id, week_start=k, count=v) for k, v in weeks.items()])
+    db.session.add_all([MonthlyWorkoutCount(user_id=user_id, month=k, count=v) for k, v in months.items()])
+    db.session.flush()
+
+
+def delete_user(user_id):
+    db.session.execute(delete(WeeklyWorkoutCount).where(WeeklyWorkoutCount.user_id == user_id))
+    db.session.execute(delete(MonthlyWorkoutCount).where(MonthlyWorkoutCount.user_id == user_id))
+
+
+def _periods(granularity, start, end):
+    if granularity == 'week':
+        day = _parse(week_key(start))
+        while day <= end:
+            yield day.strftime('%Y-%m-%d')
+            day += timedelta(days=7)
+    else:
+        year, month = start.year, start.month
+        while (year, month) <= (end.year, end.month):
+            yield f'{year}-{month:02d}'
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def history(user_id, granularity, start, end):
+    """Zero-filled [{'period', 'count'}] for every week/month between `start` and `end`.
+
+    Read-only: users without stored rollups (their next check-in or `flask rebuild-rollups
+    --missing` stores them) are counted from their Workout rows.
+    """
+    model, column = GRANULARITIES[granularity]
+    first = week_key(start) if granularity == 'week' else month_key(start)
+    last = week_key(end) if granularity == 'week' else month_key(end)
+    if _has_rollups(user_id):
+        rows = db.session.execute(
+            select(column, model.count).where(model.user_id == user_id, column >= first, column <= last)
+        )
+        counts = dict(rows.all())
+    else:
+        # Whole periods, like the stored counts (a period key sorts before the dates inside it)
+        until = (_parse(last) + timedelta(days=6)).strftime('%Y-%m-%d') if granularity == 'week' else f'{last}-31'
+        dates = db.session.execute(
+            select(Workout.date).where(Workout.user_id == user_id, Workout.date >= first, Workout.date <= until)
+        ).scalars()
+        weeks, months = counts_from_dates(dates)
+        counts = weeks if granularity == 'week' else months
+    return [{'period': p, 'count': counts.get(p, 0)} for p in _periods(granularity, start, end)]
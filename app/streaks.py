@@ -0,0 +1,103 @@
+"""Row-scan streak/stats helpers.
+
+The views compute stats from bitmaps (app.bitmaps); these are the reference
+implementation that `flask rebuild-bitmaps --check` and the tests compare them against.
+"""
+from datetime import datetime, timedelta
+
+
+def compute_streaks(workout_dates, now=None):
+    """Return (current_streak, best_streak) for an iterable of 'YYYY-MM-DD' strings."""
+    workout_dates = sorted(workout_dates)
+    if not workout_dates:
+        return 0, 0
+    date_set = set(workout_dates)
+    now = now or datetime.now()
+
+    # Current streak (ending at today)
+    current_streak = compute_streak_from(now.strftime('%Y-%m-%d'), date_set)
+
+    # Best streak
+    best_streak = 0
+    temp_streak = 0
+    for idx, workout_date in enumerate(workout_dates):
+        if idx == 0:
+            temp_streak = 1
+        else:
+            current = datetime.strptime(workout_date, '%Y-%m-%d')
+            prev = datetime.strptime(workout_dates[idx - 1], '%Y-%m-%d')
+            if (current - prev).days == 1:
+                temp_streak += 1
+            else:
+                best_streak = max(best_streak, temp_streak)
+                temp_streak = 1
+    best_streak = max(best_streak, temp_streak)
+    return current_streak, best_streak
+
+
+def compute_streak_from(start_date_str, workout_dates):
+    """Compute consecutive streak length starting from a given date string and going backward."""
+    count = 0
+    try:
+        check_date = datetime.strptime(start_date_str, '%Y-%m-%d')
+    except Exception:
+        return 0
+    for i in range(365):
+        check_str = check_date.strftime('%Y-%m-%d')
+        if check_str in workout_dates:
+            count += 1
+            check_date -= timedelta(days=1)
+        else:
+            break
+    return count
+
+
+def build_stats(workout_dates, now=None):
+    """Build the /api/stats payload from a list of workout date strings."""
+    now = now or datetime.now()
+    today = now.strftime('%Y-%m-%d')
+    current_week_start = (now - timedelta(days=now.weekday())).strftime('%Y-%m-%d')
+    current_month = now.strftime('%Y-%m')
+
+    total_workouts = len(workout_dates)
+
+    this_week = sum(1 for d in workout_dates if d >= current_week_start)
+    this_month = sum(1 for d in workout_dates if d.startswith(current_month))
+
+    weeks_data = []
+    for i in range(4):
+        week_start = (now - timedelta(days=now.weekday() + i*7)).strftime('%Y-%m-%d')
+        week_end = (now - timedelta(days=now.weekday() - 6 + i*7)).strftime('%Y-%m-%d')
+        week_count = sum(1 for d in workout_dates if week_start <= d <= week_end)
+        weeks_data.append(week_count)
+
+    avg_per_week = sum(weeks_data) / len(weeks_data) if weeks_data else 0
+    date_set = set(workout_dates)
+    current_streak, best_streak = compute_streaks(workout_dates, now)
+    # Compute a display-friendly streak: if the user hasn't logged today but did yesterday,
+    # show the streak that would include yesterday so the UI reflects the ongoing streak until they log today.
+    if current_streak == 0:
+        yesterday = (now - timedelta(days=1)).strftime('%Y-%m-%d')
+        if yesterday in date_set:
+            display_streak = compute_streak_from(yesterday, date_set)
+        else:
+            display_streak = 0
+    else:
+        display_streak = current_streak
+
+    return {
+        'total_workouts': total_workouts,
+        'this_week': this_week,
+        'this_month': this_month,
+        'avg_per_week': round(avg_per_week, 1),
+        'current_streak': current_streak,
+        'display_streak': display_streak,
+        'best_streak': best_streak,
+        'today_logged': today in date_set
+    }
+
+
+def calendar_days(workout_dates, year, month):
+    """Day-of-month numbers with a workout in the given month."""
+    month_str = f"{year}-{month:02d}"
+    return [int(d.split('-')[2]) for d in workout_dates if d.startswith(month_str)]
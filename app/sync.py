@@ -0,0 +1,180 @@
+"""Delta sync for offline-capable clients.
+
+Every user has a monotonic `sync_version`. Any flush that adds, changes or deletes one of
+their workouts, routines or badges bumps it once and stamps the touched rows with the new
+value; deletions leave a SyncTombstone at that version. A client that remembers the last
+version it saw (its cursor) can then fetch just the rows with a higher version.
+
+ORM changes are stamped automatically by the session's before_flush hook. Code that writes
+these tables with Core statements (e.g. the upsert check-in) must call `next_version()`
+and store the result in the row's `version` column itself.
+"""
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import attributes
+
+from app import bitmaps, queries, rollups
+from app.models import db, Badge, Routine, SyncTombstone, User, UserBadge, Workout, MILESTONE_BADGES
+from app.replica import RoutingSession
+from app.upsert import insert_ignore
+
+MAX_CHANGES = 500  # queued check-ins + deletions accepted per sync
+EARLIEST_DAY = date(1970, 1, 1)  # queued check-ins dated before this are rejected
+
+
+def _tombstone_key(obj):
+    if isinstance(obj, Workout):
+        return 'workout', obj.date
+    if isinstance(obj, Routine):
+        return 'routine', str(obj.day)
+    return 'badge', obj.badge.key if obj.badge else str(obj.badge_id)
+
+
+def next_versions(connection, user_ids):
+    """Atomically bump and return {user_id: new sync_version}; the UPDATE also serialises
+    concurrent writers for the same user until their transaction ends."""
+    table = User.__table__
+    rows = connection.execute(
+        update(table)
+        .where(table.c.id.in_(sorted(user_ids)))
+        .values(sync_version=table.c.sync_version + 1)
+        .returning(table.c.id, table.c.sync_version)
+    )
+    return dict(rows.all())
+
+
+def next_version(user_id):
+    """Bump one user's sync_version inside the current session transaction."""
+    version = next_versions(db.session.connection(), [user_id])[user_id]
+    user = db.session.identity_map.get(db.session.identity_key(User, user_id))
+    if user is not None:
+        attributes.set_committed_value(user, 'sync_version', version)
+    return version
+
+
+def stamp_versions(session, flush_context, instances):
+    versioned = (Workout, Routine, UserBadge)
+    changed = [
+        obj for obj in session.new | session.dirty
+        if isinstance(obj, versioned) and (obj in session.new or session.is_modified(obj, include_collections=False))
+    ]
+    deleted = [obj for obj in session.deleted if isinstance(obj, versioned)]
+    if not changed and not deleted:
+        return
+    versions = next_versions(session.connection(), {obj.user_id for obj in changed + deleted if obj.user_id})
+    # Rows of a user created in this same flush have no user row to bump yet; they keep
+    # version 0 and still reach clients through their first full sync
+    for obj in changed:
+        if obj.user_id in versions:
+            obj.version = versions[obj.user_id]
+    for obj in deleted:
+        if obj.user_id in versions:
+            kind, key = _tombstone_key(obj)
+            session.add(SyncTombstone(user_id=obj.user_id, kind=kind, key=key, version=versions[obj.user_id]))
+    for user_id, version in versions.items():
+        user = session.identity_map.get(session.identity_key(User, user_id))
+        if user is not None:
+            attributes.set_committed_value(user, 'sync_version', version)
+
+
+def init_sync(app):
+    if not event.contains(RoutingSession, 'before_flush', stamp_versions):
+        event.listen(RoutingSession, 'before_flush', stamp_versions)
+    return app
+
+
+def _parse_day(value):
+    try:
+        return datetime.strptime(str(value), '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+
+def apply_changes(user_id, checkins, deletions):
+    """Apply queued offline check-ins and workout deletions (caller commits).
+
+    Returns (per-item results, bitmaps after the changes or None if nothing changed).
+    """
+    results = []
+    years = None
+    # Clients may be a timezone ahead of the server, so allow tomorrow as well
+    latest = (datetime.now() + timedelta(days=1)).date()
+    version = None
+    for item in checkins:
+        item = item if isinstance(item, dict) else {'date': item}
+        day = _parse_day(item.get('date'))
+        if day is None or not EARLIEST_DAY <= day <= latest:
+            results.append({'op': 'checkin', 'date': item.get('date'), 'status': 'invalid'})
+            continue
+        date = day.strftime('%Y-%m-%d')
+        if version is None:
+            version = next_version(user_id)
+        notes = str(item.get('notes') or '')[:255]
+        inserted = insert_ignore(
+            Workout, {'user_id': user_id, 'date': date, 'notes': notes, 'version': version}, ('user_id', 'date')
+        )
+        if inserted is None:
+            results.append({'op': 'checkin', 'date': date, 'status': 'duplicate'})
+            continue
+        years = bitmaps.mark_workout(user_id, date)
+        rollups.adjust(user_id, date, 1)
+        results.append({'op': 'checkin', 'date': date, 'status': 'applied'})
+
+    for value in deletions:
+        day = _parse_day(value)
+        workout = day and Workout.query.filter_by(user_id=user_id, date=day.strftime('%Y-%m-%d')).first()
+        if not workout:
+            results.append({'op': 'delete', 'date': value, 'status': 'not_found'})
+            continue
+        db.session.delete(workout)
+        years = bitmaps.mark_workout(user_id, workout.date, present=False)
+        rollups.adjust(user_id, workout.date, -1)
+        results.append({'op': 'delete', 'date': workout.date, 'status': 'applied'})
+
+    if years is not None:
+        # Offline check-ins can complete a streak anywhere in the history, so use the best streak
+        best = bitmaps.longest_run(years)
+        keys = [key for days, key in MILESTONE_BADGES.items() if best >= days]
+        if keys:
+            badges = Badge.query.filter(Badge.key.in_(keys)).all()
+            if version is None:
+                version = next_version(user_id)
+            for badge in badges:
+                insert_ignore(
+                    UserBadge,
+                    {'user_id': user_id, 'badge_id': badge.id, 'awarded_at': datetime.now(), 'version': version},
+                    ('user_id', 'badge_id'),
+                )
+    return results, years
+
+
+def changes_since(user_id, cursor):
+    """Rows changed after `cursor` (everything when `cursor` is 0) plus deletions."""
+    full = cursor <= 0
+    since = None if full else cursor
+    changes = {
+        'workouts': [w.to_dict() for w in queries.workouts(user_id, since)],
+        'routines': {str(r.day): r.to_dict() for r in queries.routines(user_id, since)},
+        'badges': {
+            ub.badge.key: {'awarded_at': ub.awarded_at.strftime(queries.TIMESTAMP)}
+            for ub in queries.awarded_badges(user_id, since)
+        },
+        'deleted': {'workouts': [], 'routines': [], 'badges': []},
+    }
+    if not full:
+        live = {
+            'workout': {w['date'] for w in changes['workouts']},
+            'routine': set(changes['routines']),
+            'badge': set(changes['badges']),
+        }
+        tombstones = db.session.execute(
+            select(SyncTombstone.kind, SyncTombstone.key)
+            .where(SyncTombstone.user_id == user_id, SyncTombstone.version > cursor)
+            .order_by(SyncTombstone.version)
+        )
+        for kind, key in tombstones:
+            # Deleted and re-created since the cursor: the live row wins
+            if key not in live[kind] and key not in changes['deleted'][kind + 's']:
+                changes['deleted'][kind + 's'].append(key)
+    return changes
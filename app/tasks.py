@@ -0,0 +1,35 @@
+"""Background job handlers (see app/jobs.py); imported by create_app() so they are registered."""
+from datetime import datetime
+
+from app import bitmaps, jobs, rollups
+from app.models import db, Badge, Routine, SyncTombstone, User, UserBadge, Workout, MILESTONE_BADGES
+
+
+@jobs.handler('purge_account')
+def purge_account(user_id):
+    """Delete a user and all of their data."""
+    # Delete all related data (cascade should handle this, but being explicit)
+    Workout.query.filter_by(user_id=user_id).delete()
+    Routine.query.filter_by(user_id=user_id).delete()
+    UserBadge.query.filter_by(user_id=user_id).delete()
+    bitmaps.delete_user(user_id)
+    rollups.delete_user(user_id)
+    SyncTombstone.query.filter_by(user_id=user_id).delete()
+    User.query.filter_by(id=user_id).delete()
+    db.session.commit()
+
+
+@jobs.handler('recompute_user')
+def recompute_user(user_id):
+    """Recompute a user's streaks and award any milestone badges they have earned."""
+    if not db.session.get(User, user_id):
+        return
+    _, best_streak = bitmaps.streaks(bitmaps.load_user_bitmaps(user_id))
+    owned = {ub.badge_id for ub in UserBadge.query.filter_by(user_id=user_id).all()}
+    for days, key in MILESTONE_BADGES.items():
+        if best_streak < days:
+            continue
+        badge = Badge.query.filter_by(key=key).first()
+        if badge and badge.id not in owned:
+            db.session.add(UserBadge(user_id=user_id, badge_id=badge.id, awarded_at=datetime.utcnow()))
+    db.session.commit()
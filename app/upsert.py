@@ -0,0 +1,61 @@
+"""Dialect-aware INSERT ... ON CONFLICT helpers (SQLite and PostgreSQL)."""
+from importlib import import_module
+
+from app.models import db
+
+# Dialect modules are imported on first use; the engine has already loaded its own by then
+UPSERT_DIALECTS = {'postgresql': 'sqlalchemy.dialects.postgresql', 'sqlite': 'sqlalchemy.dialects.sqlite'}
+
+
+def supports_upsert(bind=None):
+    return (bind or db.session.get_bind()).dialect.name in UPSERT_DIALECTS
+
+
+def dialect_insert(table, bind=None):
+    """An `insert()` construct that has `on_conflict_do_nothing/do_update` for this database."""
+    name = (bind or db.session.get_bind()).dialect.name
+    if name not in UPSERT_DIALECTS:
+        raise NotImplementedError(f'ON CONFLICT is not supported for {name}')
+    return import_module(UPSERT_DIALECTS[name]).insert(table)
+
+
+def insert_ignore(model, values, index_elements):
+    """INSERT a row unless it would violate the unique index on `index_elements`.
+
+    Returns the new row's id, or None when the row already existed. Runs in the
+    session's transaction, so the caller commits.
+    """
+    stmt = (
+        dialect_insert(model)
+        .values(**values)
+        .on_conflict_do_nothing(index_elements=list(index_elements))
+        .returning(model.id)
+    )
+    return db.session.execute(stmt).scalar()
+
+
+def insert_ignore_many(model, rows, index_elements, returning):
+    """Multi-row insert_ignore(): one INSERT ... ON CONFLICT DO NOTHING for all `rows`.
+
+    Returns the `returning` columns (a list of column attributes) of the rows actually
+    inserted. Runs in the session's transaction, so the caller commits.
+    """
+    if not rows:
+        return []
+    stmt = (
+        dialect_insert(model)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=list(index_elements))
+        .returning(*returning)
+    )
+    return db.session.execute(stmt).all()
+
+
+def increment(model, values, index_elements, column, delta):
+    """INSERT `values` or, if the row exists, add `delta` to `column` (caller commits)."""
+    stmt = dialect_insert(model).values(**values, **{column: delta})
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(index_elements),
+        set_={column: getattr(model, column) + delta},
+    )
+    db.session.execute(stmt)
@@ -0,0 +1,30 @@
+"""Blueprints: auth (login/signup), api (pages and JSON API for the signed-in user),
+share (share tokens and public share pages) and admin.
+
+Admin views are registered as LazyViews, so their modules (and whatever those import)
+load on the first admin request instead of on every cold start.
+"""
+from functools import cached_property
+
+from werkzeug.utils import import_string
+
+
+class LazyView:
+    """A view function that is imported on first call (Flask's "Lazily Loading Views" pattern)."""
+
+    def __init__(self, import_name):
+        self.__module__, self.__name__ = import_name.rsplit('.', 1)
+        self.import_name = import_name
+
+    @cached_property
+    def view(self):
+        return import_string(self.import_name)
+
+    def __call__(self, *args, **kwargs):
+        return self.view(*args, **kwargs)
+
+
+def register_blueprints(app):
+    from app.views import admin, api, auth, share
+    for module in (auth, api, share, admin):
+        app.register_blueprint(module.bp)
@@ -0,0 +1,38 @@
+"""Admin blueprint.
+
+The URL map is declared here, but each view is a LazyView: its module (dashboard,
+users, audit or impersonation) and that module's imports load on the first request
+that needs it. The handlers check `current_user.is_admin` themselves.
+"""
+from flask import Blueprint
+
+from app.replica import read_replica
+from app.views import LazyView
+
+bp = Blueprint('admin', __name__)
+
+# (rule, module, view, methods, replica); `replica` marks read-only views for app/replica.py,
+# which has to see the flag before the view's module is imported
+ROUTES = [
+    ('/admin', 'dashboard', 'admin_dashboard', ['GET'], True),
+    ('/admin/analytics', 'dashboard', 'admin_analytics_page', ['GET'], False),
+    ('/api/admin/analytics', 'dashboard', 'admin_analytics', ['GET'], True),
+    ('/api/admin/jobs', 'dashboard', 'admin_jobs', ['GET', 'POST'], False),
+    ('/api/admin/ratelimit', 'dashboard', 'admin_ratelimit_stats', ['GET'], False),
+    ('/api/admin/profiles', 'dashboard', 'admin_profiles', ['GET'], False),
+    ('/api/admin/profiles/<profile_id>', 'dashboard', 'admin_profile_detail', ['GET'], False),
+    ('/api/admin/reset_password', 'users', 'admin_reset_password', ['POST'], False),
+    ('/api/admin/badge', 'users', 'admin_badge_action', ['POST'], False),
+    ('/api/admin/regenerate_share', 'users', 'admin_regenerate_share', ['POST'], False),
+    ('/api/admin/promote', 'users', 'admin_promote', ['POST'], False),
+    ('/api/admin/set_password', 'users', 'admin_set_password', ['POST'], False),
+    ('/api/admin/batch', 'users', 'admin_batch', ['POST'], False),
+    ('/api/admin/provision', 'users', 'admin_provision_users', ['POST'], False),
+    ('/api/admin/audit', 'audit', 'admin_audit_logs', ['GET'], True),
+    ('/api/admin/impersonate', 'impersonation', 'admin_impersonate', ['POST'], False),
+    ('/api/admin/stop_impersonate', 'impersonation', 'admin_stop_impersonate', ['POST'], False),
+]
+
+for rule, module, name, methods, replica in ROUTES:
+    view = LazyView(f'{__name__}.{module}.{name}')
+    bp.add_url_rule(rule, endpoint=name, view_func=read_replica(view) if replica else view, methods=methods)
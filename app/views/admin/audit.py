@@ -0,0 +1,14 @@
+"""Admin audit log."""
+from flask import request, jsonify
+from flask_login import login_required, current_user
+
+from app import queries
+
+
+# Admin-only: get recent audit logs
+@login_required
+def admin_audit_logs():
+    if not current_user.is_admin:
+        return jsonify({'error': 'forbidden'}), 403
+    limit = int(request.args.get('limit', 50))
+    return jsonify({'logs': [l.to_dict() for l in queries.audit_logs(limit)]})
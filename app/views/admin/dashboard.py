@@ -0,0 +1,87 @@
+"""Admin pages plus analytics, job queue, rate limiter and profiler endpoints."""
+from flask import current_app, render_template, request, jsonify, redirect, url_for, send_from_directory
+from flask_login import login_required, current_user
+
+from app import jobs, queries
+from app.extensions import limiter
+from app.models import db, User, AuditLog
+
+
+@login_required
+def admin_dashboard():
+    if not current_user.is_admin:
+        return redirect(url_for('api.index'))
+
+    # Per-user stats for admin table
+    return render_template('admin.html', users=queries.admin_users())
+
+@login_required
+def admin_analytics_page():
+    if not current_user.is_admin:
+        return redirect(url_for('api.index'))
+    return render_template('admin_analytics.html')
+
+@login_required
+def admin_analytics():
+    if not current_user.is_admin:
+        return jsonify({'error': 'forbidden'}), 403
+    try:
+        from app.analytics import get_analytics
+    except ImportError:
+        return jsonify({'error': 'analytics requires numpy'}), 501
+    return jsonify(get_analytics(refresh=request.args.get('refresh') == '1'))
+
+# Admin-only: job queue status, and queueing streak/badge recomputes
+@login_required
+def admin_jobs():
+    if not current_user.is_admin:
+        return jsonify({'error': 'forbidden'}), 403
+    if request.method == 'GET':
+        from app.models import Job
+        failed = Job.query.filter_by(status='failed').order_by(Job.updated_at.desc()).limit(20).all()
+        return jsonify({'counts': jobs.queue_counts(), 'failed': [j.to_dict() for j in failed]})
+
+    data = request.get_json(silent=True) or request.form
+    if data.get('all'):
+        if not current_app.config['JOB_QUEUE_ENABLED']:
+            # Inline, this would recompute every user inside one request
+            return jsonify({'error': 'the job queue is disabled; run `flask recompute-all` instead'}), 400
+        user_ids = [uid for (uid,) in db.session.query(User.id).all()]
+    else:
+        try:
+            user_ids = [int(data.get('user_id'))]
+        except Exception:
+            return jsonify({'error': 'invalid user_id'}), 400
+    for uid in user_ids:
+        jobs.defer('recompute_user', user_id=uid)
+    log = AuditLog(actor_id=current_user.id, action='queue_recompute', details=f'users={len(user_ids)}')
+    db.session.add(log)
+    db.session.commit()
+    return jsonify({'success': True, 'queued': len(user_ids) if current_app.config['JOB_QUEUE_ENABLED'] else 0})
+
+# Admin-only: rate limiter counters and bucket state
+@login_required
+def admin_ratelimit_stats():
+    if not current_user.is_admin:
+        return jsonify({'error': 'forbidden'}), 403
+    return jsonify(limiter.stats())
+
+# Admin-only: saved request profiles (newest first), one profile's summary, or its raw .prof file
+@login_required
+def admin_profiles():
+    if not current_user.is_admin:
+        return jsonify({'error': 'forbidden'}), 403
+    from app.profiler import is_enabled, list_profiles
+    return jsonify({'enabled': is_enabled(current_app), 'profiles': list_profiles(current_app)})
+
+@login_required
+def admin_profile_detail(profile_id):
+    if not current_user.is_admin:
+        return jsonify({'error': 'forbidden'}), 403
+    from app.profiler import load_profile, profile_dir
+    profile = load_profile(current_app, profile_id)
+    if profile is None:
+        return jsonify({'error': 'profile not found'}), 404
+    if request.args.get('download') == '1':
+        return send_from_directory(profile_dir(current_app), f'{profile_id}.prof', as_attachment=True)
+    return jsonify(profile)
@@ -0,0 +1,44 @@
+"""Admin impersonation: temporarily act as another user."""
+from flask import session, jsonify, request
+from flask_login import login_user, login_required, current_user
+
+from app.models import db, User, AuditLog
+
+
+# Admin: impersonate a user (temporarily switch to their identity)
+@login_required
+def admin_impersonate():
+    if not current_user.is_admin:
+        return jsonify({'error': 'forbidden'}), 403
+    data = request.get_json(silent=True) or request.form
+    try:
+        user_id = int(data.get('user_id'))
+    except Exception:
+        return jsonify({'error': 'invalid user_id'}), 400
+    target = User.query.get(user_id)
+    if not target:
+        return jsonify({'error': 'user not found'}), 404
+    # store original admin id in session
+    session['original_admin_id'] = current_user.id
+    login_user(target)
+    session['impersonated'] = True
+    log = AuditLog(actor_id=session.get('original_admin_id'), action='impersonate', details=f'target_id={target.id}')
+    db.session.add(log)
+    db.session.commit()
+    return jsonify({'success': True, 'username': target.username})
+
+# Admin: stop impersonation and restore original admin
+@login_required
+def admin_stop_impersonate():
+    orig = session.pop('original_admin_id', None)
+    session.pop('impersonated', None)
+    if not orig:
+        return jsonify({'error': 'not impersonating'}), 400
+    orig_user = User.query.get(orig)
+    if not orig_user:
+        return jsonify({'error': 'original admin not found'}), 404
+    login_user(orig_user)
+    log = AuditLog(actor_id=orig, action='stop_impersonate', details='')
+    db.session.add(log)
+    db.session.commit()
+    return jsonify({'success': True})
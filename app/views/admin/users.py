@@ -0,0 +1,200 @@
+"""Admin actions on user accounts: passwords, badges, share tokens, roles, batches, provisioning."""
+import csv
+from datetime import datetime
+
+from flask import current_app, request, jsonify
+from flask_login import login_required, current_user
+
+from app.models import db, User, Badge, UserBadge, AuditLog
+
+
+# Admin-only: reset a user's password to a temporary one and return it
+@login_required
+def admin_reset_password():
+    if not current_user.is_admin:
+        return jsonify({'error': 'forbidden'}), 403
+    data = request.get_json(silent=True) or request.form
+    try:
+        user_id = int(data.get('user_id'))
+    except Exception:
+        return jsonify({'error': 'invalid user_id'}), 400
+    user = User.query.get(user_id)
+    if not user:
+        return jsonify({'error': 'user not found'}), 404
+    import secrets
+    temp_pw = secrets.token_urlsafe(8)
+    user.set_password(temp_pw)
+    db.session.commit()
+    # Log the action
+    log = AuditLog(actor_id=current_user.id, action='reset_password', details=f'user_id={user.id}')
+    db.session.add(log)
+    db.session.commit()
+    return jsonify({'temp_password': temp_pw})
+
+# Admin-only: award or revoke a badge for a user
+@login_required
+def admin_badge_action():
+    if not current_user.is_admin:
+        return jsonify({'error': 'forbidden'}), 403
+    data = request.get_json(silent=True) or request.form
+    try:
+        user_id = int(data.get('user_id'))
+    except Exception:
+        return jsonify({'error': 'invalid user_id'}), 400
+    action = data.get('action')
+    badge_key = data.get('badge_key')
+    if action not in ('award', 'revoke'):
+        return jsonify({'error': 'invalid action'}), 400
+    badge = Badge.query.filter_by(key=badge_key).first()
+    if not badge:
+        return jsonify({'error': 'badge not found'}), 404
+    user = User.query.get(user_id)
+    if not user:
+        return jsonify({'error': 'user not found'}), 404
+    if action == 'award':
+        # avoid duplicate awards
+        if UserBadge.query.filter_by(user_id=user.id, badge_id=badge.id).first():
+            return jsonify({'error': 'already awarded'}), 400
+        ub = UserBadge(user_id=user.id, badge_id=badge.id, awarded_at=datetime.utcnow())
+        db.session.add(ub)
+        db.session.commit()
+        log = AuditLog(actor_id=current_user.id, action='award_badge', details=f'user_id={user.id} badge={badge.key}')
+        db.session.add(log)
+        db.session.commit()
+        return jsonify({'success': True})
+    else:
+        ub = UserBadge.query.filter_by(user_id=user.id, badge_id=badge.id).first()
+        if not ub:
+            return jsonify({'error': 'badge not awarded'}), 400
+        db.session.delete(ub)
+        db.session.commit()
+        log = AuditLog(actor_id=current_user.id, action='revoke_badge', details=f'user_id={user.id} badge={badge.key}')
+        db.session.add(log)
+        db.session.commit()
+        return jsonify({'success': True})
+
+# Admin-only: regenerate a user's share token
+@login_required
+def admin_regenerate_share():
+    if not current_user.is_admin:
+        return jsonify({'error': 'forbidden'}), 403
+    data = request.get_json(silent=True) or request.form
+    try:
+        user_id = int(data.get('user_id'))
+    except Exception:
+        return jsonify({'error': 'invalid user_id'}), 400
+    user = User.query.get(user_id)
+    if not user:
+        return jsonify({'error': 'user not found'}), 404
+    import secrets
+    token = secrets.token_urlsafe(12)
+    user.share_token = token
+    db.session.commit()
+    log = AuditLog(actor_id=current_user.id, action='regenerate_share', details=f'user_id={user.id}')
+    db.session.add(log)
+    db.session.commit()
+    return jsonify({'share_token': token})
+
+# Admin actions: promote/demote users
+@login_required
+def admin_promote():
+    # Only admins may perform this action
+    if not current_user.is_admin:
+        return jsonify({'error': 'forbidden'}), 403
+
+    data = request.get_json(silent=True) or request.form
+    try:
+        user_id = int(data.get('user_id'))
+    except Exception:
+        return jsonify({'error': 'invalid user_id'}), 400
+
+    make_admin = data.get('make_admin', True)
+    # Accept 'true'/'false' strings for form posts
+    if isinstance(make_admin, str):
+        make_admin = make_admin.lower() in ('1', 'true', 'yes', 'on')
+
+    target = User.query.get(user_id)
+    if not target:
+        return jsonify({'error': 'user not found'}), 404
+
+    # Prevent removing the last admin accidentally: require at least one admin remains
+    if target.id == current_user.id and not make_admin:
+        # Allow self-demotion but ensure someone else is admin first
+        other_admin_count = User.query.filter(User.is_admin == True, User.id != current_user.id).count()
+        if other_admin_count == 0:
+            return jsonify({'error': 'cannot remove admin role from last admin'}), 400
+
+    target.is_admin = bool(make_admin)
+    db.session.commit()
+
+    return jsonify({'success': True, 'user_id': target.id, 'is_admin': target.is_admin})
+
+# Admin: set user's password to a custom value
+@login_required
+def admin_set_password():
+    if not current_user.is_admin:
+        return jsonify({'error': 'forbidden'}), 403
+    data = request.get_json(silent=True) or request.form
+    try:
+        user_id = int(data.get('user_id'))
+        new_pw = data.get('new_password')
+    except Exception:
+        return jsonify({'error': 'invalid parameters'}), 400
+    if not new_pw or len(new_pw) < 6:
+        return jsonify({'error': 'password too short (min 6 chars)'}), 400
+    user = User.query.get(user_id)
+    if not user:
+        return jsonify({'error': 'user not found'}), 404
+    user.set_password(new_pw)
+    db.session.commit()
+    log = AuditLog(actor_id=current_user.id, action='set_password', details=f'user_id={user.id}')
+    db.session.add(log)
+    db.session.commit()
+    # Return the new password in response for admin to show in modal briefly if needed
+    return jsonify({'success': True, 'new_password': new_pw})
+
+# Admin-only: apply many admin operations (badges, promote, share tokens, password resets) in one request
+@login_required
+def admin_batch():
+    if not current_user.is_admin:
+        return jsonify({'error': 'forbidden'}), 403
+    from app.admin_batch import run_batch
+    data = request.get_json(silent=True) or {}
+    operations = data.get('operations')
+    if not isinstance(operations, list) or not operations:
+        return jsonify({'error': 'operations must be a non-empty list'}), 400
+    sizes = [len(op['user_ids']) if isinstance(op, dict) and isinstance(op.get('user_ids'), list) else 1
+             for op in operations]
+    if sum(sizes) > current_app.config['ADMIN_BATCH_MAX_OPS']:
+        return jsonify({'error': f"at most {current_app.config['ADMIN_BATCH_MAX_OPS']} operations per batch"}), 400
+    resets = sum(size for op, size in zip(operations, sizes) if isinstance(op, dict) and op.get('op') == 'reset_password')
+    if resets > current_app.config['ADMIN_BATCH_MAX_RESETS']:
+        return jsonify({'error': f"at most {current_app.config['ADMIN_BATCH_MAX_RESETS']} reset_password operations per batch"}), 400
+    results = run_batch(current_user.id, operations, chunk_size=current_app.config['ADMIN_BATCH_CHUNK_SIZE'])
+    applied = sum(1 for r in results if r['status'] == 'ok')
+    return jsonify({'applied': applied, 'failed': len(results) - applied, 'results': results})
+
+# Admin-only: create members from a small uploaded CSV (username,email[,password])
+@login_required
+def admin_provision_users():
+    if not current_user.is_admin:
+        return jsonify({'error': 'forbidden'}), 403
+    from app.provisioning import read_members_csv, provision_users
+    upload = request.files.get('file')
+    raw = upload.read() if upload else request.get_data()
+    if not raw:
+        return jsonify({'error': 'CSV file is required'}), 400
+    try:
+        members, errors = read_members_csv(raw)
+    except (UnicodeDecodeError, csv.Error):
+        return jsonify({'error': 'invalid CSV'}), 400
+    limit = current_app.config['PROVISION_INLINE_MAX']
+    if len(members) > limit:
+        return jsonify({'error': f'at most {limit} members per upload; import larger CSVs with `flask provision-users`'}), 413
+    # Hash in this process: a process pool inside a web request is fragile on serverless hosts
+    result = provision_users(members, batch_size=current_app.config['PROVISION_BATCH_SIZE'], workers=1)
+    log = AuditLog(actor_id=current_user.id, action='provision_users', details=f'created={result["created"]} skipped={len(result["skipped"])}')
+    db.session.add(log)
+    db.session.commit()
+    result['errors'] = [{'line': line, 'error': msg} for line, msg in errors]
+    return jsonify(result)
@@ -0,0 +1,343 @@
+"""Pages and JSON API for the signed-in user: check-ins, stats, calendar, routines, badges, settings."""
+import calendar
+from datetime import datetime, timedelta
+
+from flask import Blueprint, current_app, render_template, request, jsonify, redirect, url_for, make_response
+from flask_login import logout_user, login_required, current_user
+
+from app import bitmaps, jobs, queries, rollups
+from app.models import db, User, Workout, Routine, Badge, UserBadge, AuditLog, MILESTONE_BADGES
+from app.replica import read_replica
+from app.sync import next_version
+
+bp = Blueprint('api', __name__)
+
+
+@bp.route('/')
+@login_required
+def index():
+    return render_template('index.html')
+
+@bp.route('/routines')
+@login_required
+def routines():
+    return render_template('routines.html')
+
+@bp.route('/api/stats', methods=['GET'])
+@login_required
+@read_replica
+def get_stats():
+    return jsonify(bitmaps.build_stats(bitmaps.load_user_bitmaps(current_user.id)))
+
+@bp.route('/api/stats/history', methods=['GET'])
+@login_required
+@read_replica
+def get_stats_history():
+    """Workout counts per week or month between `from` and `to` (YYYY-MM-DD, inclusive)."""
+    granularity = request.args.get('granularity', 'week')
+    if granularity not in rollups.GRANULARITIES:
+        return jsonify({'error': 'granularity must be week or month'}), 400
+    today = datetime.now().date()
+    try:
+        end = datetime.strptime(request.args['to'], '%Y-%m-%d').date() if request.args.get('to') else today
+        if request.args.get('from'):
+            start = datetime.strptime(request.args['from'], '%Y-%m-%d').date()
+        else:
+            start = end - timedelta(weeks=51) if granularity == 'week' else end.replace(day=1) - timedelta(days=335)
+    except ValueError:
+        return jsonify({'error': 'from/to must be YYYY-MM-DD'}), 400
+    if start > end or (end - start).days > 366 * 25:
+        return jsonify({'error': 'invalid date range'}), 400
+    return jsonify({
+        'granularity': granularity,
+        'from': start.strftime('%Y-%m-%d'),
+        'to': end.strftime('%Y-%m-%d'),
+        'history': rollups.history(current_user.id, granularity, start, end)
+    })
+
+@bp.route('/api/workouts', methods=['GET'])
+@login_required
+@read_replica
+def get_workouts():
+    return jsonify([w.to_dict() for w in queries.workouts(current_user.id)])
+
+@bp.route('/api/checkout-today', methods=['POST'])
+@login_required
+def checkout_today():
+    from app.upsert import insert_ignore
+    today = datetime.now().strftime('%Y-%m-%d')
+    notes = request.json.get('notes', '') if request.json else ''
+
+    # One transaction: the unique (user_id, date) index decides whether this is a new check-in,
+    # so two taps racing each other still produce a single row
+    version = next_version(current_user.id)
+    workout_id = insert_ignore(Workout, {'user_id': current_user.id, 'date': today, 'notes': notes, 'version': version}, ('user_id', 'date'))
+    if workout_id is None:
+        db.session.rollback()
+        return jsonify({'error': 'Already checked in today'}), 400
+
+    years = bitmaps.mark_workout(current_user.id, today)
+    rollups.adjust(current_user.id, today, 1)
+    current_streak, best_streak = bitmaps.streaks(years)
+
+    # Award milestone badges if applicable
+    new_badge = None
+    if current_streak in MILESTONE_BADGES:
+        badge = Badge.query.filter_by(key=MILESTONE_BADGES[current_streak]).first()
+        if badge and insert_ignore(UserBadge, {'user_id': current_user.id, 'badge_id': badge.id, 'awarded_at': datetime.now(), 'version': version},
+                                   ('user_id', 'badge_id')) is not None:
+            new_badge = badge.to_dict()
+    db.session.commit()
+
+    resp = make_response(jsonify({
+        'success': True,
+        'current_streak': current_streak,
+        'best_streak': best_streak,
+        'new_badge': new_badge
+    }))
+    # set a persistent streak cookie for convenience (30 days)
+    if current_streak is not None:
+        resp.set_cookie('streak', str(current_streak), max_age=30*24*3600, httponly=True, samesite='Lax', secure=current_app.config.get('REMEMBER_COOKIE_SECURE', False))
+    return resp
+
+@bp.route('/api/sync', methods=['POST'])
+@login_required
+def sync_changes():
+    """Apply queued offline check-ins/deletions and return what changed since the client's cursor.
+
+    Body: {"cursor": <last cursor or 0>, "checkins": [{"date", "notes"}], "deletions": ["YYYY-MM-DD"]}
+    """
+    from app.sync import MAX_CHANGES, apply_changes, changes_since
+    data = request.get_json(silent=True) or {}
+    checkins = data.get('checkins') or []
+    deletions = data.get('deletions') or []
+    try:
+        cursor = int(data.get('cursor') or 0)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'cursor must be an integer'}), 400
+    if not isinstance(checkins, list) or not isinstance(deletions, list):
+        return jsonify({'error': 'checkins and deletions must be lists'}), 400
+    if len(checkins) + len(deletions) > MAX_CHANGES:
+        return jsonify({'error': f'at most {MAX_CHANGES} changes per sync'}), 400
+
+    results, years = apply_changes(current_user.id, checkins, deletions)
+    db.session.commit()
+
+    # Read the version before the rows: anything committed later gets a higher version
+    version = db.session.execute(db.select(User.sync_version).where(User.id == current_user.id)).scalar()
+    if cursor > version:
+        cursor = 0  # the server's history was reset; start over with a full sync
+    changes = changes_since(current_user.id, cursor)
+    if years is None:
+        years = bitmaps.load_user_bitmaps(current_user.id)
+    current_streak, best_streak = bitmaps.streaks(years)
+    return jsonify({
+        'cursor': version,
+        'full': cursor == 0,
+        'results': results,
+        'current_streak': current_streak,
+        'best_streak': best_streak,
+        **changes,
+    })
+
+@bp.route('/api/routines', methods=['GET'])
+@login_required
+@read_replica
+def get_routines():
+    return jsonify({str(r.day): r.to_dict() for r in queries.routines(current_user.id)})
+
+@bp.route('/api/routines/<int:day>', methods=['PUT', 'DELETE'])
+@login_required
+def manage_routine(day):
+    if day < 0 or day > 6:
+        return jsonify({'error': 'Invalid day'}), 400
+
+    routine = Routine.query.filter_by(user_id=current_user.id, day=day).first()
+
+    if request.method == 'PUT':
+        if not routine:
+            routine = Routine(user_id=current_user.id, day=day, name='', is_rest_day=False)
+            db.session.add(routine)
+            db.session.flush()
+        data = request.json or {}
+        routine.name = data.get('name', '')
+        routine.is_rest_day = data.get('is_rest_day', False)
+        routine.set_muscle_groups(data.get('muscle_groups', []))
+        db.session.commit()
+
+        return jsonify({
+            'success': True,
+            'routine': {
+                'day': routine.day,
+                'name': routine.name,
+                'muscle_groups': routine.get_muscle_groups(),
+                'is_rest_day': routine.is_rest_day
+            }
+        })
+
+    elif request.method == 'DELETE':
+        if not routine:
+            return jsonify({'success': True, 'routine': {'day': day, 'name': '', 'muscle_groups': [], 'is_rest_day': False}})
+        routine.name = ''
+        routine.muscle_groups = '[]'
+        routine.is_rest_day = False
+        db.session.commit()
+        return jsonify({'success': True, 'routine': {
+            'day': routine.day,
+            'name': '',
+            'muscle_groups': [],
+            'is_rest_day': False
+        }})
+
+@bp.route('/api/workouts/<date>', methods=['DELETE'])
+@login_required
+def delete_workout(date):
+    workout = Workout.query.filter_by(user_id=current_user.id, date=date).first()
+
+    if not workout:
+        return jsonify({'error': 'Workout not found'}), 404
+
+    db.session.delete(workout)
+    years = bitmaps.mark_workout(current_user.id, date, present=False)
+    rollups.adjust(current_user.id, date, -1)
+    db.session.commit()
+
+    current_streak, best_streak = bitmaps.streaks(years)
+
+    resp = make_response(jsonify({
+        'success': True,
+        'current_streak': current_streak,
+        'best_streak': best_streak
+    }))
+    # update or clear streak cookie
+    if current_streak and current_streak > 0:
+        resp.set_cookie('streak', str(current_streak), max_age=30*24*3600, httponly=True, samesite='Lax', secure=current_app.config.get('REMEMBER_COOKIE_SECURE', False))
+    else:
+        resp.set_cookie('streak', '', expires=0)
+    return resp
+
+@bp.route('/api/calendar', methods=['GET'])
+@login_required
+@read_replica
+def get_calendar():
+    month = request.args.get('month')
+    year = request.args.get('year')
+
+    if not month or not year:
+        now = datetime.now()
+        month = now.month
+        year = now.year
+    else:
+        month = int(month)
+        year = int(year)
+
+    years = bitmaps.load_user_bitmaps(current_user.id)
+
+    return jsonify({
+        'workout_dates': bitmaps.month_days(years, year, month),
+        'month': month,
+        'year': year
+    })
+
+@bp.route('/api/heatmap', methods=['GET'])
+@login_required
+@read_replica
+def get_heatmap():
+    """A year of workout days as a base64 bitmap (bit N of the little-endian value = day-of-year N+1)."""
+    year = request.args.get('year', type=int) or datetime.now().year
+    years = bitmaps.load_user_bitmaps(current_user.id)
+    return jsonify({
+        'year': year,
+        'days': 366 if calendar.isleap(year) else 365,
+        'bitmap': bitmaps.encode_year(years, year)
+    })
+
+@bp.route('/api/badges', methods=['GET'])
+@login_required
+@read_replica
+def get_badges():
+    awarded_map = {ub.badge.key: ub.to_dict() for ub in queries.awarded_badges(current_user.id)}
+
+    return jsonify({
+        'badges': [b.to_dict() for b in queries.badges()],
+        'awarded': awarded_map
+    })
+
+# Render badges page
+@bp.route('/badges')
+@login_required
+def badges_page():
+    return render_template('badges.html')
+
+# Settings is now a modal; redirect direct /settings visits to home
+@bp.route('/settings')
+@login_required
+def settings_page():
+    return redirect(url_for('api.index'))
+
+@bp.route('/api/settings/username', methods=['PUT'])
+@login_required
+def change_username():
+    data = request.json or {}
+    new_username = data.get('username', '').strip()
+
+    if not new_username:
+        return jsonify({'error': 'Username is required'}), 400
+
+    if len(new_username) < 3 or len(new_username) > 20:
+        return jsonify({'error': 'Username must be between 3 and 20 characters'}), 400
+
+    if new_username == current_user.username:
+        return jsonify({'error': 'New username must be different from current username'}), 400
+
+    # Check if username already exists
+    existing_user = User.query.filter_by(username=new_username).first()
+    if existing_user and existing_user.id != current_user.id:
+        return jsonify({'error': 'Username already taken'}), 400
+
+    old_username = current_user.username
+    current_user.username = new_username
+    db.session.commit()
+
+    # Audit log
+    try:
+        log = AuditLog(actor_id=current_user.id, action='change_username', details=f'old={old_username}, new={new_username}')
+        db.session.add(log)
+        db.session.commit()
+    except Exception:
+        try:
+            db.session.rollback()
+        except Exception:
+            db.session.remove()
+
+    return jsonify({'success': True, 'username': new_username})
+
+@bp.route('/api/settings/account', methods=['DELETE'])
+@login_required
+def delete_account():
+    # Get user ID before deletion (for audit log)
+    user_id = current_user.id
+    username = current_user.username
+
+    # Disable the account right away; the data itself is purged by a background job
+    # (or inline when the job queue is disabled)
+    current_user.is_active = False
+    current_user.share_token = None
+    jobs.defer('purge_account', user_id=user_id)
+    db.session.commit()
+
+    # Audit log (create before user deletion)
+    try:
+        log = AuditLog(actor_id=None, action='account_deleted', details=f'user_id={user_id}, username={username}')
+        db.session.add(log)
+        db.session.commit()
+    except Exception:
+        try:
+            db.session.rollback()
+        except Exception:
+            db.session.remove()
+
+    # Logout the user
+    logout_user()
+
+    return jsonify({'success': True, 'message': 'Account deleted successfully'})
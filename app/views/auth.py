@@ -0,0 +1,101 @@
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, session
+from flask_login import login_user, logout_user, login_required, current_user
+
+from app.extensions import limiter, login_manager
+from app.models import db, User, Routine
+
+bp = Blueprint('auth', __name__)
+
+
+@login_manager.user_loader
+def load_user(user_id):
+    try:
+        user = User.query.get(int(user_id))
+        # Accounts awaiting a background purge can no longer be used
+        return user if user and user.is_active is not False else None
+    except Exception as e:
+        from app.schema import ensure_schema_changes
+        # If the DB schema is missing new columns (e.g., share_token/is_admin), attempt to add them and retry once.
+        current_app.logger.warning('load_user failed, attempting schema fix: %s', e)
+        try:
+            ensure_schema_changes()
+            # Clear any failed transaction state before retrying
+            try:
+                db.session.rollback()
+            except Exception:
+                db.session.remove()
+            return User.query.get(int(user_id))
+        except Exception as e2:
+            current_app.logger.exception('load_user still failing after schema fix: %s', e2)
+            try:
+                db.session.rollback()
+            except Exception:
+                db.session.remove()
+            return None
+
+
+@bp.route('/login', methods=['GET', 'POST'])
+@limiter.limit('login', methods=('POST',), template='login.html')
+def login():
+    if current_user.is_authenticated:
+        return redirect(url_for('api.index'))
+
+    if request.method == 'POST':
+        username = request.form.get('username')
+        password = request.form.get('password')
+
+        user = User.query.filter_by(username=username).first()
+
+        if user and user.is_active is not False and user.check_password(password):
+            remember = request.form.get('remember') in ('1', 'on', 'true', 'True')
+            login_user(user, remember=remember)
+            # When 'remember' is checked, make session permanent (longer lifetime)
+            session.permanent = remember
+            return redirect(url_for('api.index'))
+        else:
+            return render_template('login.html', error='Invalid username or password')
+
+    return render_template('login.html')
+
+@bp.route('/signup', methods=['GET', 'POST'])
+@limiter.limit('signup', methods=('POST',), template='signup.html')
+def signup():
+    if current_user.is_authenticated:
+        return redirect(url_for('api.index'))
+
+    if request.method == 'POST':
+        username = request.form.get('username')
+        email = request.form.get('email')
+        password = request.form.get('password')
+        confirm_password = request.form.get('confirm_password')
+
+        if password != confirm_password:
+            return render_template('signup.html', error='Passwords do not match')
+
+        if User.query.filter_by(username=username).first():
+            return render_template('signup.html', error='Username already exists')
+
+        if User.query.filter_by(email=email).first():
+            return render_template('signup.html', error='Email already exists')
+
+        user = User(username=username, email=email)
+        user.set_password(password)
+        db.session.add(user)
+        db.session.commit()
+
+        # Create default routines for new user
+        for day in range(7):
+            routine = Routine(user_id=user.id, day=day, name='', is_rest_day=False)
+            db.session.add(routine)
+        db.session.commit()
+
+        login_user(user)
+        return redirect(url_for('api.index'))
+
+    return render_template('signup.html')
+
+@bp.route('/logout')
+@login_required
+def logout():
+    logout_user()
+    return redirect(url_for('auth.login'))
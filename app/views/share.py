@@ -0,0 +1,68 @@
+"""Share tokens and the public streak page."""
+from flask import Blueprint, render_template, request, jsonify, url_for
+from flask_login import login_required, current_user
+
+from app import bitmaps, queries
+from app.extensions import limiter
+from app.models import db, AuditLog
+from app.replica import read_replica
+
+bp = Blueprint('share', __name__)
+
+
+@bp.route('/api/share-token', methods=['GET','POST'])
+@login_required
+def share_token_handler():
+    # GET: return existing token (or null)
+    if request.method == 'GET':
+        return jsonify({'share_token': current_user.share_token})
+
+    # POST: create a fresh token for the current user
+    import secrets
+    token = secrets.token_urlsafe(12)
+    current_user.share_token = token
+    db.session.commit()
+    share_url = url_for('share.public_share', token=token, _external=True)
+    # audit
+    try:
+        log = AuditLog(actor_id=current_user.id, action='create_share_token', details=f'token={token}')
+        db.session.add(log)
+        db.session.commit()
+    except Exception:
+        # don't fail the API if audit logging fails
+        try:
+            db.session.rollback()
+        except Exception:
+            db.session.remove()
+    return jsonify({'share_token': token, 'share_url': share_url})
+
+@bp.route('/api/share-token/revoke', methods=['POST'])
+@login_required
+def revoke_share_token():
+    if not current_user.share_token:
+        return jsonify({'success': True, 'message': 'no token'})
+    old = current_user.share_token
+    current_user.share_token = None
+    db.session.commit()
+    try:
+        log = AuditLog(actor_id=current_user.id, action='revoke_share_token', details=f'old_token={old}')
+        db.session.add(log)
+        db.session.commit()
+    except Exception:
+        try:
+            db.session.rollback()
+        except Exception:
+            db.session.remove()
+    return jsonify({'success': True})
+
+@bp.route('/share/<token>', methods=['GET'])
+@limiter.limit('share', keys=('ip', 'token'), template='share.html')
+@read_replica
+def public_share(token):
+    user = queries.shared_user(token)
+    if not user:
+        return render_template('share.html', error='Share link not found')
+
+    # Compute user stats
+    current_streak, best_streak = bitmaps.streaks(bitmaps.load_user_bitmaps(user.id))
+    return render_template('share.html', user=user, current_streak=current_streak, best_streak=best_streak)
@@ -1,4 +1,5 @@
 #!/bin/bash
 cd "$(dirname "$0")"
 python3 -m pip install -r requirements.txt --quiet
+python3 -m app.assets
 python3 app.py
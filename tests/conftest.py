@@ -0,0 +1,46 @@
+"""Fixtures: each test gets its own app on a throwaway SQLite database."""
+import pytest
+from sqlalchemy import insert, select
+
+from app.factory import create_app
+from app.models import db, User
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv('INSTANCE_PATH', str(tmp_path))
+    monkeypatch.setenv('RATELIMIT_ENABLED', 'false')
+    monkeypatch.delenv('DATABASE_URL', raising=False)
+    monkeypatch.delenv('DATABASE_READ_URL', raising=False)
+    app = create_app()
+    app.config['TESTING'] = True
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def make_user(app):
+    """make_user(name) -> id of a new user with a placeholder password hash."""
+    def make_user(username, is_admin=False):
+        with app.app_context():
+            db.session.execute(insert(User).values(
+                username=username, email=f'{username}@example.com', password_hash='x', is_admin=is_admin,
+            ))
+            user_id = db.session.execute(select(User.id).where(User.username == username)).scalar()
+            db.session.commit()
+            return user_id
+    return make_user
+
+
+@pytest.fixture
+def login(app):
+    """login(user_id) -> a test client signed in as that user."""
+    def login(user_id):
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(user_id)
+            sess['_fresh'] = True
+        return client
+    return login
@@ -0,0 +1,88 @@
+from datetime import datetime
+
+from sqlalchemy import event
+from werkzeug.security import check_password_hash
+
+from app.admin_batch import _apply_chunk, expand, validate
+from app.models import db, AuditLog, User, UserBadge
+
+
+def test_batch_rejects_non_string_badge_keys(app, make_user, login):
+    admin_id = make_user('admin', is_admin=True)
+    user_id = make_user('member')
+    resp = login(admin_id).post('/api/admin/batch', json={'operations': [
+        {'op': 'award_badge', 'user_id': user_id, 'badge_key': ['streak_7']},
+        {'op': 'revoke_badge', 'user_id': user_id, 'badge_key': {'key': 'streak_7'}},
+        {'op': 'award_badge', 'user_id': user_id, 'badge_key': 'streak_7'},
+        {'op': 'reset_password', 'user_id': user_id},
+    ]})
+    assert resp.status_code == 200
+    results = resp.get_json()['results']
+    assert [r['status'] for r in results] == ['error', 'error', 'ok', 'ok']
+    assert results[0]['error'] == results[1]['error'] == 'invalid badge_key'
+    with app.app_context():
+        assert check_password_hash(db.session.get(User, user_id).password_hash, results[3]['temp_password'])
+
+
+def test_award_racing_another_award_is_ignored(app, make_user):
+    admin_id = make_user('admin', is_admin=True)
+    user_id = make_user('member')
+    with app.app_context():
+        items, results = expand([
+            {'op': 'award_badge', 'user_id': user_id, 'badge_key': 'streak_7'},
+            {'op': 'promote', 'user_id': user_id},
+        ])
+        planned, badges = validate(items, results)
+        # A check-in awards the badge between validation and the write
+        db.session.add(UserBadge(user_id=user_id, badge_id=badges['streak_7'], awarded_at=datetime.now()))
+        db.session.commit()
+
+        _apply_chunk(admin_id, planned, items, results, badges)
+        db.session.commit()
+
+        assert results[0] == dict(results[0], status='error', error='already awarded')
+        assert results[1]['status'] == 'pending'  # run_batch marks the rest ok after the commit
+        assert db.session.get(User, user_id).is_admin
+        assert UserBadge.query.filter_by(user_id=user_id).count() == 1
+        assert [a.action for a in AuditLog.query.all()] == ['promote']
+
+
+def test_award_to_many_users_is_one_insert(app, make_user, login):
+    admin_id = make_user('admin', is_admin=True)
+    user_ids = [make_user(f'member{i}') for i in range(5)]
+    with app.app_context():
+        engine = db.engine
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        resp = login(admin_id).post('/api/admin/batch', json={'operations': [
+            {'op': 'award_badge', 'user_ids': user_ids, 'badge_key': 'streak_30'},
+        ]})
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    assert resp.get_json()['applied'] == 5
+    assert len([s for s in statements if s.startswith('INSERT INTO user_badge')]) == 1
+    with app.app_context():
+        assert UserBadge.query.count() == 5
+
+
+def test_batch_caps_password_resets(app, make_user, login):
+    app.config['ADMIN_BATCH_MAX_RESETS'] = 2
+    admin_id = make_user('admin', is_admin=True)
+    user_ids = [make_user(f'member{i}') for i in range(3)]
+    client = login(admin_id)
+    resp = client.post('/api/admin/batch', json={'operations': [
+        {'op': 'reset_password', 'user_ids': user_ids[:2]},
+        {'op': 'reset_password', 'user_id': user_ids[2]},
+    ]})
+    assert resp.status_code == 400
+    assert 'reset_password' in resp.get_json()['error']
+    resp = client.post('/api/admin/batch', json={'operations': [
+        {'op': 'reset_password', 'user_ids': user_ids[:2]},
+        {'op': 'regenerate_share', 'user_ids': user_ids},
+    ]})
+    assert resp.get_json()['applied'] == 5
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from app.analytics import DAY_OFFSET, _day_numbers, _unique_pairs, compute
+
+
+def test_unique_pairs_keeps_days_before_1970():
+    uids = np.array([2, 1, 2, 1, 1, 2], dtype=np.int64)
+    days = _day_numbers(['1969-12-31', '2024-02-29', '1969-12-31', '1900-01-01', '2024-02-29', '1970-01-01'])
+    out_uids, out_days = _unique_pairs(uids, days)
+    assert out_uids.tolist() == [1, 1, 2, 2]
+    assert [str(np.datetime64(int(d), 'D')) for d in out_days] == ['1900-01-01', '2024-02-29', '1969-12-31', '1970-01-01']
+
+
+def test_unique_pairs_rejects_values_it_cannot_pack():
+    uids = np.array([1], dtype=np.int64)
+    with pytest.raises(ValueError):
+        _unique_pairs(uids, np.array([-DAY_OFFSET - 1], dtype=np.int64))
+    with pytest.raises(ValueError):
+        _unique_pairs(uids, np.array([DAY_OFFSET], dtype=np.int64))
+    with pytest.raises(ValueError):
+        _unique_pairs(np.array([1 << 40], dtype=np.int64), np.array([0], dtype=np.int64))
+    empty = np.empty(0, dtype=np.int64)
+    assert [a.tolist() for a in _unique_pairs(empty, empty)] == [[], []]
+
+
+def test_compute_with_no_workouts(app):
+    with app.app_context():
+        result = compute()
+    assert result['workouts'] == 0
+    assert all(bucket['users'] == 0 for bucket in result['streaks']['best'])
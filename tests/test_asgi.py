@@ -0,0 +1,108 @@
+import asyncio
+import gzip
+import importlib
+import json
+import shutil
+import time
+
+import pytest
+from sqlalchemy import insert, select
+
+pytest.importorskip('aiosqlite')
+
+
+def asgi_get(application, path, headers=()):
+    """Run one GET through the ASGI app; returns (status, body, headers)."""
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+        'root_path': '', 'headers': [(b'host', b'localhost'), *headers],
+        'client': ('127.0.0.1', 1234), 'server': ('localhost', 80),
+    }
+    asyncio.run(application(scope, receive, send))
+    body = b''.join(m.get('body', b'') for m in messages if m['type'] == 'http.response.body')
+    return messages[0]['status'], body, dict(messages[0]['headers'])
+
+
+@pytest.fixture
+def asgi(tmp_path, monkeypatch):
+    # app.asgi builds its Flask app at import, so every test shares the first one's database
+    monkeypatch.setenv('INSTANCE_PATH', str(tmp_path))
+    monkeypatch.delenv('DATABASE_URL', raising=False)
+    monkeypatch.delenv('DATABASE_READ_URL', raising=False)
+    return importlib.import_module('app.asgi')
+
+
+def session_cookie(flask_app, **values):
+    client = flask_app.test_client()
+    with client.session_transaction() as sess:
+        sess.update(values)
+    name = flask_app.config['SESSION_COOKIE_NAME']
+    return (b'cookie', f'{name}={client.get_cookie(name).value}'.encode())
+
+
+def test_share_page_is_rate_limited_under_asgi(asgi, monkeypatch):
+    config = asgi.flask_app.config
+    monkeypatch.setitem(config, 'RATELIMIT_ENABLED', True)
+    monkeypatch.setitem(config, 'RATELIMIT_RULES', dict(config['RATELIMIT_RULES'], share='2/60'))
+
+    statuses = [asgi_get(asgi.application, '/share/asgi-limit-test')[0] for _ in range(3)]
+    assert statuses == [200, 200, 429]
+
+
+def test_async_reads_follow_replica_routing(asgi, tmp_path, monkeypatch):
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from app.models import db, User, Workout
+
+    flask_app = asgi.flask_app
+    with flask_app.app_context():
+        db.session.execute(insert(User).values(username='asgi-replica', email='asgi-replica@example.com', password_hash='x'))
+        user_id = db.session.execute(select(User.id).where(User.username == 'asgi-replica')).scalar()
+        db.session.commit()
+        # A replica that has the user but lags behind their first workout
+        replica_path = tmp_path / 'replica.db'
+        shutil.copy(db.engine.url.database, replica_path)
+        db.session.execute(insert(Workout).values(user_id=user_id, date='2024-01-01', notes=''))
+        db.session.commit()
+    replica_engine = create_async_engine(f'sqlite+aiosqlite:///{replica_path}')
+    monkeypatch.setattr(asgi, 'AsyncReplicaSessionLocal', async_sessionmaker(replica_engine))
+
+    def total(**session):
+        status, body, _ = asgi_get(asgi.application, '/api/stats', [session_cookie(flask_app, **session)])
+        assert status == 200
+        return json.loads(body)['total_workouts']
+
+    try:
+        assert total(_user_id=str(user_id)) == 0
+        assert total(_user_id=str(user_id), _last_write_at=time.time()) == 1
+        assert total(_user_id=str(user_id), _last_write_at=time.time() - 3600) == 0
+    finally:
+        asyncio.run(replica_engine.dispose())
+
+
+def test_async_reads_are_compressed(asgi):
+    from app.models import db, User, Workout
+
+    flask_app = asgi.flask_app
+    with flask_app.app_context():
+        db.session.execute(insert(User).values(username='asgi-gzip', email='asgi-gzip@example.com', password_hash='x'))
+        user_id = db.session.execute(select(User.id).where(User.username == 'asgi-gzip')).scalar()
+        db.session.execute(insert(Workout), [
+            {'user_id': user_id, 'date': f'2024-01-{day:02d}', 'notes': 'squats'} for day in range(1, 29)
+        ])
+        db.session.commit()
+    cookie = session_cookie(flask_app, _user_id=str(user_id))
+
+    status, body, headers = asgi_get(asgi.application, '/api/workouts', [cookie, (b'accept-encoding', b'gzip')])
+    assert status == 200 and headers[b'content-encoding'] == b'gzip'
+    assert len(json.loads(gzip.decompress(body))) == 28
+    _, body, headers = asgi_get(asgi.application, '/api/workouts', [cookie])
+    assert b'content-encoding' not in headers and len(json.loads(body)) == 28
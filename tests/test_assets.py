@@ -0,0 +1,18 @@
+import os
+import shutil
+
+from app.assets import ASSETS, build_assets, load_manifest
+
+
+def test_committed_build_matches_sources(app, tmp_path):
+    # Vercel serves static/dist/ as committed, so a source edit must come with a rebuild
+    for name in ASSETS:
+        os.makedirs(tmp_path / os.path.dirname(name), exist_ok=True)
+        shutil.copy(os.path.join(app.static_folder, name), tmp_path / name)
+    assert load_manifest(app.static_folder) == build_assets(str(tmp_path)), 'run `python -m app.assets`'
+
+
+def test_templates_link_the_fingerprinted_files(app):
+    manifest = load_manifest(app.static_folder)
+    body = app.test_client().get('/login').get_data(as_text=True)
+    assert any(hashed in body for hashed in manifest.values())
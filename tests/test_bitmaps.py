@@ -0,0 +1,97 @@
+import base64
+import calendar
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, select
+
+from app import bitmaps, streaks
+from app.models import db, Workout, WorkoutBitmap
+
+FIRST_YEAR, LAST_YEAR = 2019, 2025  # includes the leap years 2020 and 2024
+
+
+def random_days(rng):
+    """A random set of workout days: scattered days, runs of every length (some crossing
+    New Year), the boundary days of each year, and some years left empty."""
+    years = [y for y in range(FIRST_YEAR, LAST_YEAR + 1) if rng.random() < 0.6]
+    days = set()
+    for year in years:
+        length = 366 if calendar.isleap(year) else 365
+        for _ in range(rng.randint(0, 12)):
+            start = date(year, 1, 1) + timedelta(days=rng.randrange(length))
+            days.update(start + timedelta(days=i) for i in range(rng.choice([1, 1, 2, 5, 20, 400])))
+        if rng.random() < 0.5:
+            # A run across New Year, or just one of the boundary days
+            start = date(year, 12, 31) - timedelta(days=rng.randrange(3))
+            days.update(start + timedelta(days=i) for i in range(rng.randint(1, 6)))
+        if calendar.isleap(year) and rng.random() < 0.5:
+            days.update([date(year, 2, 28), date(year, 2, 29), date(year, 3, 1)])
+    return days
+
+
+def random_now(rng, days):
+    candidates = [date(2024, 2, 29), date(2024, 3, 1), date(2023, 12, 31), date(2024, 1, 1), date(2021, 1, 1)]
+    if days:
+        day = rng.choice(sorted(days))
+        candidates += [day, day + timedelta(days=1), day + timedelta(days=2)]
+    day = rng.choice(candidates)
+    return datetime(day.year, day.month, day.day, rng.randrange(24), rng.randrange(60))
+
+
+@pytest.mark.parametrize('seed', range(200))
+def test_bitmaps_match_row_scan(seed):
+    rng = random.Random(seed)
+    days = random_days(rng)
+    dates = sorted(d.strftime('%Y-%m-%d') for d in days)
+    years = bitmaps.bitmaps_from_dates(dates)
+    now = random_now(rng, days)
+
+    assert bitmaps.build_stats(years, now) == streaks.build_stats(dates, now)
+
+    for year in range(FIRST_YEAR - 1, LAST_YEAR + 3):
+        for month in range(1, 13):
+            prefix = f'{year}-{month:02d}-'
+            expected = [int(d[-2:]) for d in dates if d.startswith(prefix)]
+            assert bitmaps.month_days(years, year, month) == expected
+        raw = base64.b64decode(bitmaps.encode_year(years, year))
+        assert len(raw) == bitmaps.YEAR_BYTES
+        value = int.from_bytes(raw, 'little')
+        assert {i for i in range(bitmaps.YEAR_BITS) if value >> i & 1} == {
+            d.timetuple().tm_yday - 1 for d in days if d.year == year
+        }
+
+
+def test_load_user_bitmaps_does_not_write(app, make_user):
+    user_id = make_user('reader')
+    dates = ['2023-12-31', '2024-01-01', '2024-02-29']
+    with app.app_context():
+        db.session.execute(insert(Workout), [{'user_id': user_id, 'date': d, 'notes': ''} for d in dates])
+        db.session.commit()
+
+        assert bitmaps.load_user_bitmaps(user_id) == bitmaps.bitmaps_from_dates(dates)
+        assert not db.session.new and not db.session.dirty
+        db.session.rollback()
+        assert db.session.execute(select(WorkoutBitmap.id)).first() is None
+
+
+def test_write_paths_keep_stored_bitmaps_in_sync(app, make_user, login):
+    user_id = make_user('writer')
+    client = login(user_id)
+    today = date.today()
+    past = [(today - timedelta(days=n)).isoformat() for n in (1, 2, 3, 40, 400)]
+
+    assert client.post('/api/checkout-today', json={}).status_code == 200
+    resp = client.post('/api/sync', json={'cursor': 0, 'checkins': [{'date': d} for d in past + ['2020-02-29']]})
+    assert resp.status_code == 200
+    assert client.delete(f'/api/workouts/{past[1]}').status_code == 200
+    resp = client.post('/api/sync', json={'cursor': 0, 'deletions': [past[3], today.isoformat()],
+                                          'checkins': [{'date': '2019-12-31'}]})
+    assert resp.status_code == 200
+
+    with app.app_context():
+        dates = db.session.execute(select(Workout.date).where(Workout.user_id == user_id)).scalars().all()
+        assert sorted(dates) == sorted(['2019-12-31', '2020-02-29', past[0], past[2], past[4]])
+        assert db.session.execute(select(WorkoutBitmap.id).where(WorkoutBitmap.user_id == user_id)).first()
+        assert bitmaps.load_user_bitmaps(user_id) == bitmaps.bitmaps_from_dates(dates)
@@ -0,0 +1,24 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from app.models import Workout
+
+TAPS = 8
+
+
+def test_parallel_taps_create_one_workout(app, make_user, login):
+    user_id = make_user('tapper')
+    clients = [login(user_id) for _ in range(TAPS)]
+    barrier = threading.Barrier(TAPS)
+
+    def tap(client):
+        barrier.wait()
+        return client.post('/api/checkout-today', json={}).status_code
+
+    with ThreadPoolExecutor(max_workers=TAPS) as pool:
+        statuses = list(pool.map(tap, clients))
+    assert sorted(statuses) == [200] + [400] * (TAPS - 1)
+    today = datetime.now().strftime('%Y-%m-%d')
+    with app.app_context():
+        assert Workout.query.filter_by(user_id=user_id, date=today).count() == 1
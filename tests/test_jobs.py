@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app import jobs
+from app.models import db, Job
+
+CALLS = []
+
+
+@jobs.handler('test_record')
+def record(**payload):
+    CALLS.append(payload)
+
+
+@jobs.handler('test_fail')
+def fail(**payload):
+    raise RuntimeError('boom')
+
+
+@pytest.fixture
+def ctx(app):
+    with app.app_context():
+        yield
+
+
+def queue(kind, **kwargs):
+    job = jobs.enqueue(kind, **kwargs)
+    db.session.commit()
+    return job.id
+
+
+def make_runnable(job_id):
+    db.session.execute(update(Job).where(Job.id == job_id).values(run_after=datetime.utcnow() - timedelta(seconds=1)))
+    db.session.commit()
+
+
+def test_job_is_claimed_once_when_workers_race(ctx, monkeypatch):
+    job_id = queue('test_record', n=1)
+    winners = []
+    guarded_update = jobs.update
+
+    def race(*args):
+        # Worker a claims the job after worker b picked it as a candidate
+        monkeypatch.setattr(jobs, 'update', guarded_update)
+        winners.append(jobs.claim('worker-a'))
+        return guarded_update(*args)
+
+    monkeypatch.setattr(jobs, 'update', race)
+    assert jobs.claim('worker-b') is None
+    assert winners[0].id == job_id
+    job = db.session.get(Job, job_id)
+    assert (job.status, job.locked_by, job.attempts) == ('running', 'worker-a', 1)
+    assert jobs.claim('worker-c') is None
+
+
+def test_expired_lock_is_reclaimed(ctx):
+    job_id = queue('test_record', n=2)
+    assert jobs.claim('worker-a', visibility_timeout=60).id == job_id
+    assert jobs.claim('worker-b') is None
+
+    # worker-a died: its lock runs out
+    db.session.execute(update(Job).where(Job.id == job_id).values(locked_until=datetime.utcnow() - timedelta(seconds=1)))
+    db.session.commit()
+    job = jobs.claim('worker-b')
+    assert (job.id, job.locked_by, job.attempts) == (job_id, 'worker-b', 2)
+    CALLS.clear()
+    assert jobs.run_job(job)
+    assert CALLS == [{'n': 2}]
+    assert db.session.get(Job, job_id).status == 'done'
+
+
+def test_job_fails_after_max_attempts(ctx):
+    job_id = queue('test_fail', max_attempts=2)
+    assert not jobs.run_job(jobs.claim('worker-a'))
+    job = db.session.get(Job, job_id)
+    assert job.status == 'queued' and job.run_after > datetime.utcnow()
+    assert jobs.claim('worker-a') is None  # backing off
+
+    make_runnable(job_id)
+    assert not jobs.run_job(jobs.claim('worker-a'))
+    job = db.session.get(Job, job_id)
+    assert (job.status, job.attempts) == ('failed', 2)
+    assert 'boom' in job.last_error
+    make_runnable(job_id)
+    assert jobs.claim('worker-a') is None
+
+
+def test_recompute_all_needs_the_job_queue(app, make_user, login):
+    app.config['JOB_QUEUE_ENABLED'] = False
+    client = login(make_user('admin', is_admin=True))
+    resp = client.post('/api/admin/jobs', json={'all': True})
+    assert resp.status_code == 400
+    assert 'flask recompute-all' in resp.get_json()['error']
+
+    app.config['JOB_QUEUE_ENABLED'] = True
+    resp = client.post('/api/admin/jobs', json={'all': True})
+    assert resp.get_json()['queued'] == 1
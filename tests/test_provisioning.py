@@ -0,0 +1,44 @@
+from app import provisioning
+from app.models import User
+
+CSV = 'username,email\nann,ann@example.com\nbob,bob@example.com\ncy,cy@example.com\n'
+
+
+def test_provision_endpoint_hashes_inline(app, make_user, login, monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError('no process pool inside a request')
+
+    monkeypatch.setattr(provisioning, 'ProcessPoolExecutor', no_pool)
+    resp = login(make_user('admin', is_admin=True)).post('/api/admin/provision', data=CSV)
+    assert resp.status_code == 200
+    assert resp.get_json()['created'] == 3
+    with app.app_context():
+        assert User.query.count() == 4
+
+
+def test_provision_endpoint_rejects_large_uploads(app, make_user, login):
+    app.config['PROVISION_INLINE_MAX'] = 2
+    resp = login(make_user('admin', is_admin=True)).post('/api/admin/provision', data=CSV)
+    assert resp.status_code == 413
+    assert 'flask provision-users' in resp.get_json()['error']
+    with app.app_context():
+        assert User.query.count() == 1
+
+
+def test_provision_users_shares_one_pool_across_batches(app, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    pools = []
+
+    class CountingPool(ThreadPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            pools.append(self)
+
+    monkeypatch.setattr(provisioning, 'ProcessPoolExecutor', CountingPool)
+    members, _ = provisioning.read_members_csv(CSV)
+    with app.app_context():
+        result = provisioning.provision_users(members, batch_size=1, workers=2)
+        assert result['created'] == 3
+        assert User.query.count() == 3
+    assert len(pools) == 1
@@ -0,0 +1,23 @@
+def login_statuses(client, forwarded_for):
+    return [
+        client.post('/login', data={'username': 'nobody', 'password': 'x'},
+                    headers={'X-Forwarded-For': value}).status_code
+        for value in forwarded_for
+    ]
+
+
+def test_spoofed_forwarded_for_does_not_get_fresh_buckets(app):
+    app.config.update(RATELIMIT_ENABLED=True, RATELIMIT_TRUSTED_PROXIES=1,
+                      RATELIMIT_RULES=dict(app.config['RATELIMIT_RULES'], login='2/60'))
+    client = app.test_client()
+    # The client prepends a different address each time; the proxy appends the real one
+    statuses = login_statuses(client, [f'10.0.0.{i}, 203.0.113.7' for i in range(3)])
+    assert statuses[2] == 429
+    assert login_statuses(client, ['203.0.113.8']) != [429]
+
+
+def test_forwarded_for_is_ignored_without_trusted_proxies(app):
+    app.config.update(RATELIMIT_ENABLED=True, RATELIMIT_TRUSTED_PROXIES=0,
+                      RATELIMIT_RULES=dict(app.config['RATELIMIT_RULES'], login='2/60'))
+    statuses = login_statuses(app.test_client(), [f'198.51.100.{i}' for i in range(3)])
+    assert statuses[2] == 429
@@ -0,0 +1,60 @@
+from datetime import date, timedelta
+
+from sqlalchemy import event, insert, update
+
+from app import rollups
+from app.models import db, User, Workout
+
+DATES = ['2023-12-30', '2023-12-31', '2024-01-01', '2024-02-29', '2024-03-04']
+
+
+def add_workouts(app, user_id, dates):
+    """Insert Workout rows directly, leaving the user's bitmaps and rollups unbuilt."""
+    with app.app_context():
+        db.session.execute(insert(Workout), [{'user_id': user_id, 'date': d, 'notes': ''} for d in dates])
+        db.session.commit()
+
+
+def test_replica_views_do_not_write(app, make_user, login):
+    user_id = make_user('lifter', is_admin=True)
+    today = date.today()
+    add_workouts(app, user_id, DATES + [(today - timedelta(days=i)).isoformat() for i in range(3)])
+    with app.app_context():
+        db.session.execute(update(User).where(User.id == user_id).values(share_token='tok'))
+        db.session.commit()
+        engine = db.engine
+    client = login(user_id)
+
+    urls = ['/share/tok', '/api/stats/history?granularity=month&from=2023-11-01']
+    for rule in app.url_map.iter_rules():
+        if getattr(app.view_functions[rule.endpoint], 'use_replica', False) and not rule.arguments:
+            urls.append(rule.rule)
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        for url in urls:
+            assert client.get(url).status_code == 200, url
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    writes = [s for s in statements if not s.lstrip().upper().startswith(('SELECT', 'PRAGMA'))]
+    assert not writes
+
+
+def test_history_without_rollups_matches_stored_rollups(app, make_user):
+    user_id = make_user('historian')
+    add_workouts(app, user_id, DATES)
+    start, end = date(2023, 12, 1), date(2024, 3, 5)  # ends mid-week
+    with app.app_context():
+        from_rows = {g: rollups.history(user_id, g, start, end) for g in rollups.GRANULARITIES}
+        rollups.rebuild_user(user_id)
+        db.session.commit()
+        stored = {g: rollups.history(user_id, g, start, end) for g in rollups.GRANULARITIES}
+    assert from_rows == stored
+    assert {p['period']: p['count'] for p in stored['month']} == {
+        '2023-12': 2, '2024-01': 1, '2024-02': 1, '2024-03': 1,
+    }
@@ -0,0 +1,86 @@
+import threading
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import insert, select
+
+from app import bitmaps, recompute
+from app.models import db, Badge, UserBadge, Workout, WorkoutBitmap
+
+
+def add_week_of_workouts(app, user_id):
+    with app.app_context():
+        db.session.execute(insert(Workout), [
+            {'user_id': user_id, 'date': (date(2024, 1, 1) + timedelta(days=i)).isoformat(), 'notes': ''}
+            for i in range(7)
+        ])
+        db.session.commit()
+
+
+def test_recompute_all_uses_the_app_database(app, make_user, tmp_path, monkeypatch):
+    user_id = make_user('lifter')
+    add_week_of_workouts(app, user_id)
+    # A relative SQLite URL means the instance folder to the app, not the working directory
+    monkeypatch.setenv('DATABASE_URL', 'sqlite:///gym_streak.db')
+    monkeypatch.chdir(tmp_path.parent)
+
+    result = app.test_cli_runner().invoke(args=['recompute-all', '--workers', '1'])
+    assert result.exit_code == 0, result.output
+    with app.app_context():
+        assert db.session.execute(select(WorkoutBitmap.year).where(WorkoutBitmap.user_id == user_id)).scalar() == 2024
+        assert UserBadge.query.filter_by(user_id=user_id).count() == 1
+
+
+def test_recompute_shard_keeps_badges_it_did_not_see(app, make_user, monkeypatch):
+    user_id = make_user('lifter')
+    add_week_of_workouts(app, user_id)
+    with app.app_context():
+        database_url = recompute.worker_database_url(db.engine, {})
+        badge_id = db.session.execute(select(Badge.id).where(Badge.key == 'streak_7')).scalar()
+        db.session.add(UserBadge(user_id=user_id, badge_id=badge_id, awarded_at=datetime.now()))
+        db.session.commit()
+
+    stored_rows = recompute._stored_rows
+
+    def stale_stored_rows(conn, lo, hi):
+        # Writers that don't take the user lock could still award a badge the shard missed
+        stored, _ = stored_rows(conn, lo, hi)
+        return stored, {}
+
+    monkeypatch.setattr(recompute, '_stored_rows', stale_stored_rows)
+    recompute._init_worker(database_url)
+    summary = recompute.recompute_shard(user_id, user_id)
+    assert summary['rows']['badges'] == 1
+    with app.app_context():
+        assert UserBadge.query.filter_by(user_id=user_id).count() == 1
+
+
+def test_recompute_shard_does_not_lose_concurrent_checkins(app, make_user, login, monkeypatch):
+    user_id = make_user('lifter')
+    add_week_of_workouts(app, user_id)
+    with app.app_context():
+        # Stored bitmaps out of date, as after an import: the shard will rewrite them
+        db.session.add(WorkoutBitmap(user_id=user_id, year=2024, bits=bitmaps.to_bytes(0)))
+        db.session.commit()
+        database_url = recompute.worker_database_url(db.engine, {})
+    client = login(user_id)
+    statuses = []
+    checkin = threading.Thread(target=lambda: statuses.append(client.post('/api/checkout-today', json={}).status_code))
+    stored_rows = recompute._stored_rows
+
+    def stored_rows_during_checkin(conn, lo, hi):
+        # The shard has read the workouts; a check-in arrives before it reads the stored rows
+        checkin.start()
+        checkin.join(timeout=0.5)
+        assert checkin.is_alive(), 'the check-in should wait for the shard to commit'
+        return stored_rows(conn, lo, hi)
+
+    monkeypatch.setattr(recompute, '_stored_rows', stored_rows_during_checkin)
+    recompute._init_worker(database_url)
+    recompute.recompute_shard(user_id, user_id)
+    checkin.join()
+    assert statuses == [200]
+    with app.app_context():
+        dates = db.session.execute(select(Workout.date).where(Workout.user_id == user_id)).scalars().all()
+        assert len(dates) == 8
+        assert bitmaps.load_user_bitmaps(user_id) == bitmaps.bitmaps_from_dates(dates)
+        assert db.session.execute(select(WorkoutBitmap.id).where(WorkoutBitmap.user_id == user_id)).all()
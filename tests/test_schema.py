@@ -0,0 +1,23 @@
+from sqlalchemy import insert, text
+
+from app.models import db, MonthlyWorkoutCount, Workout, WorkoutBitmap
+from app.schema import ensure_schema_changes
+
+
+def test_dedupe_rebuilds_rollups_and_bitmaps(app, make_user):
+    user_id = make_user('doubletap')
+    with app.app_context():
+        # A database from before the unique index, where a double tap stored the day twice
+        db.session.execute(text('DROP INDEX uq_workout_user_date'))
+        db.session.execute(insert(Workout), [
+            {'user_id': user_id, 'date': d, 'notes': ''} for d in ['2024-01-01', '2024-01-01', '2024-01-02']
+        ])
+        # ...and each tap was added to the rollups
+        db.session.add(MonthlyWorkoutCount(user_id=user_id, month='2024-01', count=3))
+        db.session.commit()
+
+        ensure_schema_changes()
+
+        assert Workout.query.filter_by(user_id=user_id).count() == 2
+        assert MonthlyWorkoutCount.query.filter_by(user_id=user_id).one().count == 2
+        assert WorkoutBitmap.query.filter_by(user_id=user_id, year=2024).count() == 1
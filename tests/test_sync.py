@@ -0,0 +1,28 @@
+from datetime import date, timedelta
+
+from app.models import Workout
+
+
+def test_sync_rejects_checkins_outside_date_window(app, make_user, login):
+    client = login(make_user('syncer'))
+    today = date.today()
+    too_late = (today + timedelta(days=2)).isoformat()
+    resp = client.post('/api/sync', json={'cursor': 0, 'checkins': [
+        {'date': '0001-01-01'},
+        {'date': '1969-12-31'},
+        {'date': '1970-01-01'},
+        {'date': (today + timedelta(days=1)).isoformat()},
+        {'date': too_late},
+    ]})
+    assert resp.status_code == 200
+    statuses = {r['date']: r['status'] for r in resp.get_json()['results']}
+    assert statuses == {
+        '0001-01-01': 'invalid',
+        '1969-12-31': 'invalid',
+        '1970-01-01': 'applied',
+        (today + timedelta(days=1)).isoformat(): 'applied',
+        too_late: 'invalid',
+    }
+    with app.app_context():
+        stored = sorted(w.date for w in Workout.query.all())
+    assert stored == ['1970-01-01', (today + timedelta(days=1)).isoformat()]